@@ -2,15 +2,13 @@ import logging
 import os
 
 from flask import Flask
-from prometheus_client import make_wsgi_app
-from werkzeug.middleware.dispatcher import DispatcherMiddleware
 
+from .audit import start_audit_writer
 from .config import get_database_url
-from .database import Base, SessionLocal, engine
-from .metrics import metrics_app, start_metrics_updater
-from .migrations.run_migrations import run_migrations
+from .init_db import check_db, init_db
+from .database import Base, Session, SessionLocal, engine
+from .metrics import start_metrics_server, start_metrics_updater
 from .sockets import notify_game_update, socketio
-from .utils import init_settings
 from .routes import init_app
 from .blueprints import bp
 
@@ -28,27 +26,13 @@ def create_app():
     app.secret_key = os.getenv('SECRET_KEY', 'dev-secret-key')
     app.config.from_object('config')
 
-    # Attach prometheus WSGI app
-    app.wsgi_app = DispatcherMiddleware(app.wsgi_app, {
-        '/metrics': metrics_app
-    })
-
-    # Database migrations
-    logger.info("Running migrations...")
-    try:
-        run_migrations()
-    except ImportError as e:
-        logger.error(f"Migrations module not found: {e}")
-    except Exception as e:
-        logger.error(f"Unexpected error in migrations: {e}")
-
-    # Create tables
-    logger.info("Creating database tables if they don't exist.")
-    Base.metadata.create_all(bind=engine)
-
-    # Initialize default settings
-    logger.info("Initializing default settings...")
-    init_settings()
+    # Schema setup is owned by `python -m app.init_db` (the db-init job) or
+    # by RUN_DB_INIT=1; otherwise workers only check the schema is current
+    # so a missing migration stops startup instead of failing per request
+    if os.getenv('RUN_DB_INIT', '0') == '1':
+        init_db()
+    else:
+        check_db()
 
     # Initialize template filters and app settings first
     init_app(app)
@@ -56,6 +40,10 @@ def create_app():
     # Register blueprint after filters
     app.register_blueprint(bp)
 
+    @app.teardown_appcontext
+    def remove_session(exception=None):
+        Session.remove()
+
     # Initialize SocketIO
     socketio.init_app(
         app,
@@ -71,11 +59,12 @@ def create_app():
         transports=['websocket', 'polling'],
     )
 
-    # Start metrics updater thread
+    # Start metrics updater thread and the dedicated metrics endpoint
     start_metrics_updater()
+    start_metrics_server()
+
+    # Start background audit log writer
+    start_audit_writer()
 
     return app
 
-# Create and configure the application instance
-app = create_app()
-application = app  # Add this line to expose the application for Gunicorn
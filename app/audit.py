@@ -0,0 +1,92 @@
+"""Background writer for audit rows that don't need to share the request's transaction.
+
+Queued rows trade durability for latency: they are written shortly after the
+request, outside its transaction, so a failed write is only logged and rows
+still queued when the process is killed (rather than exiting normally) are
+lost. Changes to entries, settings and maintenance state pass their session to
+log_audit instead, so their audit row commits with them.
+"""
+import atexit
+import logging
+import queue
+import time
+from threading import Lock, Thread
+
+from sqlalchemy import insert
+
+from .database import engine
+from .models import AuditLog
+
+logger = logging.getLogger(__name__)
+
+AUDIT_QUEUE_SIZE = 10000
+AUDIT_BATCH_SIZE = 200
+AUDIT_FLUSH_INTERVAL = 0.1  # seconds
+
+_audit_queue = queue.Queue(AUDIT_QUEUE_SIZE)
+_writer_thread = None
+_writer_lock = Lock()
+
+def _write_batch(rows):
+    """Insert a batch of audit rows in a single transaction"""
+    with engine.begin() as conn:
+        conn.execute(insert(AuditLog), rows)
+
+def _next_batch():
+    """Block for the first row, then gather more until the batch fills or the interval ends"""
+    batch = [_audit_queue.get()]
+    deadline = time.monotonic() + AUDIT_FLUSH_INTERVAL
+    while len(batch) < AUDIT_BATCH_SIZE:
+        remaining = deadline - time.monotonic()
+        if remaining <= 0:
+            break
+        try:
+            batch.append(_audit_queue.get(timeout=remaining))
+        except queue.Empty:
+            break
+    return batch
+
+def _writer_loop():
+    while True:
+        batch = _next_batch()
+        try:
+            _write_batch(batch)
+        except Exception as e:
+            logger.error("Error writing %s audit log entries: %s", len(batch), e)
+
+def flush_audit_queue():
+    """Write whatever is still queued; registered to run at interpreter exit"""
+    rows = []
+    while True:
+        try:
+            rows.append(_audit_queue.get_nowait())
+        except queue.Empty:
+            break
+    for start in range(0, len(rows), AUDIT_BATCH_SIZE):
+        try:
+            _write_batch(rows[start:start + AUDIT_BATCH_SIZE])
+        except Exception as e:
+            logger.error("Error flushing audit log entries: %s", e)
+
+def start_audit_writer():
+    """Start the background thread that drains queued audit rows"""
+    global _writer_thread
+    with _writer_lock:
+        if _writer_thread is None or not _writer_thread.is_alive():
+            _writer_thread = Thread(target=_writer_loop, name="audit-writer", daemon=True)
+            _writer_thread.start()
+            atexit.register(flush_audit_queue)
+
+def enqueue_audit(row):
+    """Queue an audit row for the writer, writing it directly if that isn't possible"""
+    if _writer_thread is not None:
+        try:
+            _audit_queue.put_nowait(row)
+            return
+        except queue.Full:
+            logger.warning("Audit queue full, writing entry synchronously")
+    # The caller's own change may already be committed; don't fail its request
+    try:
+        _write_batch([row])
+    except Exception:
+        logger.exception("Error writing audit log entry")
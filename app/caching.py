@@ -1,50 +1,105 @@
 # caching.py
+import os
+import time
+from collections import OrderedDict
+from threading import RLock
+
+import orjson
 from prometheus_client import Counter
 
 CACHE_HITS = Counter('cache_hits_total', 'Cache hit count', ['function'])
 CACHE_MISSES = Counter('cache_misses_total', 'Cache miss count', ['function'])
 
+def _env_number(name, cast):
+    value = os.getenv(name)
+    return cast(value) if value else None
+
+# Defaults for every cache; ops can tune them without code changes
+CACHE_MAXSIZE = _env_number('CACHE_MAXSIZE', int) or 512
+CACHE_TTL = _env_number('CACHE_TTL', float)
+
+_ORJSON_KEY_OPTIONS = orjson.OPT_SORT_KEYS | orjson.OPT_NON_STR_KEYS
+
 class CacheWithMetrics:
-    """Base cache decorator with metrics tracking"""
-    def __init__(self, func):
+    """Base cache decorator with metrics tracking
+
+    Entries are kept in least-recently-used order and the oldest is evicted
+    once ``maxsize`` is reached. With ``ttl`` set, entries expire that many
+    seconds after they were stored, which bounds staleness across worker
+    processes that cannot see each other's ``cache_clear()``.
+    """
+    def __init__(self, func, ttl=None, maxsize=None):
         self.func = func
         self.name = func.__name__
-        self.cache = {}
+        self.ttl = ttl if ttl is not None else CACHE_TTL
+        self.maxsize = maxsize or CACHE_MAXSIZE
+        self.cache = OrderedDict()
+        self._lock = RLock()
+        # Resolve the labelled children once rather than on every call
+        self._hit_metric = CACHE_HITS.labels(function=self.name)
+        self._miss_metric = CACHE_MISSES.labels(function=self.name)
         self.hits = 0
         self.misses = 0
 
     def __call__(self, *args, **kwargs):
         key = self._make_key(args, kwargs)
-        if key in self.cache:
-            self.hits += 1
-            CACHE_HITS.labels(function=self.name).inc()
-            return self.cache[key]
+        with self._lock:
+            cached = self.cache.get(key)
+            if cached is not None:
+                expires_at, result = cached
+                if expires_at is None or time.monotonic() < expires_at:
+                    self.cache.move_to_end(key)
+                    self.hits += 1
+                    self._hit_metric.inc()
+                    return result
+                del self.cache[key]
+            self.misses += 1
 
-        self.misses += 1
-        CACHE_MISSES.labels(function=self.name).inc()
+        self._miss_metric.inc()
         result = self.func(*args, **kwargs)
-        self.cache[key] = result
+        expires_at = time.monotonic() + self.ttl if self.ttl is not None else None
+        with self._lock:
+            self.cache[key] = (expires_at, result)
+            self.cache.move_to_end(key)
+            while len(self.cache) > self.maxsize:
+                self.cache.popitem(last=False)
         return result
 
     def _make_key(self, args, kwargs):
-        return args + tuple(sorted(kwargs.items()))
+        # Positional-only calls, the common case, skip sorting the kwargs
+        return args + tuple(sorted(kwargs.items())) if kwargs else args
 
     def cache_info(self):
         return {
             'hits': self.hits,
             'misses': self.misses,
-            'maxsize': None,
+            'maxsize': self.maxsize,
             'currsize': len(self.cache)
         }
 
     def cache_clear(self):
-        self.cache.clear()
-        self.hits = 0
-        self.misses = 0
+        with self._lock:
+            self.cache.clear()
+            self.hits = 0
+            self.misses = 0
 
 class HashableCacheWithMetrics(CacheWithMetrics):
     """Cache decorator that handles unhashable types"""
     def _make_key(self, args, kwargs):
+        # Most calls pass only hashable values, which need no conversion
+        key = (args, tuple(sorted(kwargs.items())) if kwargs else ())
+        try:
+            hash(key)
+            return key
+        except TypeError:
+            pass
+
+        # Nested dicts/lists serialize to a deterministic key in one C call
+        try:
+            return orjson.dumps((args, kwargs), option=_ORJSON_KEY_OPTIONS)
+        except TypeError:
+            pass
+
         def make_hashable(obj):
             if isinstance(obj, dict):
                 return tuple(sorted((k, make_hashable(v)) for k, v in obj.items()))
@@ -56,3 +111,9 @@ class HashableCacheWithMetrics(CacheWithMetrics):
         hashable_args = tuple(make_hashable(arg) for arg in args)
         hashable_kwargs = tuple(sorted((k, make_hashable(v)) for k, v in kwargs.items()))
         return (hashable_args, hashable_kwargs)
+
+def ttl_cache(ttl, cache_class=HashableCacheWithMetrics):
+    """Decorator factory for a metrics-tracking cache whose entries expire after ttl seconds"""
+    def decorator(func):
+        return cache_class(func, ttl=ttl)
+    return decorator
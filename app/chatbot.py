@@ -7,6 +7,7 @@ from fuzzywuzzy import fuzz, process
 import logging
 from sqlalchemy import text, func
 from typing import Dict, List, Optional, Union, Any
+from datetime import time as dt_time
 from datetime import timedelta
 
 from .database import SessionLocal
@@ -336,7 +337,7 @@ def generate_trend_response(params, db):
         response += f"• Remote Days: {remote} ({(remote/total_days * 100):.1f}%)\n"
         
         # Calculate average arrival time
-        times = [datetime.strptime(e.time, "%H:%M") for e in user_data if e.status in ['in-office', 'remote']]
+        times = [dt_time.fromisoformat(e.time) for e in user_data if e.status in ['in-office', 'remote']]
         if times:
             avg_minutes = sum((t.hour * 60 + t.minute) for t in times) // len(times)
             avg_time = f"{avg_minutes//60:02d}:{avg_minutes%60:02d}"
@@ -453,7 +454,7 @@ def generate_stats_response(params, db):
     response += f"• Leave Days: {leave}\n"
     
     # Average arrival time
-    times = [datetime.strptime(e.time, "%H:%M") for e in entries if e.status in ['in-office', 'remote']]
+    times = [dt_time.fromisoformat(e.time) for e in entries if e.status in ['in-office', 'remote']]
     if times:
         avg_minutes = sum((t.hour * 60 + t.minute) for t in times) // len(times)
         avg_time = f"{avg_minutes//60:02d}:{avg_minutes%60:02d}"
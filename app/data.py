@@ -1,59 +1,84 @@
 from decimal import Decimal
-from datetime import datetime, timedelta
-from sqlalchemy import text
+from datetime import date, datetime, timedelta
+from datetime import time as dt_time
+from functools import lru_cache
+from sqlalchemy import insert, select, text
+from sqlalchemy.dialects.postgresql import insert as pg_insert
 from flask import request
+import csv
+import io
 import logging
 from collections import defaultdict
+from itertools import groupby
+import operator
+from operator import itemgetter
 
 from .models import Settings  # Add this import
-from .database import SessionLocal
+from .database import Session, SessionLocal
 from .utils import get_settings  # Use utils instead
-from .streaks import calculate_current_streak, get_current_streak_info  # Remove calculate_streak_for_date
-from .helpers import in_period, calculate_average_time
+from .utils import get_request_settings
+from .streaks import (calculate_current_streak, current_streak_lengths,
+                      get_current_streak_infos)
+from .helpers import batched, minutes_to_hhmm, normalize_status, period_bounds
 
 # Create a logger instance
 logger = logging.getLogger(__name__)
 
-def compare_times(time1, time2, operator):
+# Arrival datetimes keep the 1900-01-01 date that strptime("%H:%M") gave them
+_ARRIVAL_BASE_DATE = (1900, 1, 1)
+
+# Working days for users without their own entry in points.working_days
+_DEFAULT_WORKING_DAYS = frozenset(('mon', 'tue', 'wed', 'thu', 'fri'))
+
+@lru_cache(maxsize=8192)
+def _parse_ymd(date_str):
+    """Parse a YYYY-MM-DD string once into (datetime, weekday name, weekday abbreviation, is_weekend)"""
+    parsed = datetime.fromisoformat(date_str)
+    return parsed, parsed.strftime('%A').lower(), parsed.strftime('%a').lower(), parsed.weekday() >= 5
+
+# Rule comparison operators, shared by time and numeric comparisons
+_COMPARE_OPS = {
+    '<': operator.lt,
+    '>': operator.gt,
+    '=': operator.eq,
+    '>=': operator.ge,
+    '<=': operator.le
+}
+
+def _never(a, b):
+    return False
+
+@lru_cache(maxsize=4096)
+def _parse_hm(time_str):
+    """Parse an HH:MM string once into a time object"""
+    return dt_time.fromisoformat(time_str)
+
+def compare_times(time1, time2, op):
     """Compare two time objects"""
-    ops = {
-        '<': lambda: time1 < time2,
-        '>': lambda: time1 > time2,
-        '=': lambda: time1 == time2,
-        '>=': lambda: time1 >= time2,
-        '<=': lambda: time1 <= time2
-    }
-    return ops.get(operator, lambda: False)()
+    return _COMPARE_OPS.get(op, _never)(time1, time2)
 
-def compare_values(val1, val2, operator):
+def compare_values(val1, val2, op):
     """Compare two numeric values"""
-    ops = {
-        '<': lambda: val1 < val2,
-        '>': lambda: val1 > val2,
-        '=': lambda: val1 == val2,
-        '>=': lambda: val1 >= val2,
-        '<=': lambda: val1 <= val2
-    }
-    return ops.get(operator, lambda: False)()
+    return _COMPARE_OPS.get(op, _never)(val1, val2)
 
 def evaluate_rule(rule, entry, context):
     """Evaluate a single scoring rule for an entry"""
     try:
         if rule['type'] == 'condition':
             if 'time' in rule:
-                entry_time = datetime.strptime(entry['time'], '%H:%M').time()
-                compare_time = datetime.strptime(rule['value'], '%H:%M').time()
+                entry_time = _parse_hm(entry['time'])
+                compare_time = _parse_hm(rule['value'])
                 return compare_times(entry_time, compare_time, rule['operator'])
             elif 'status' in rule:
                 return entry['status'] == rule['value']
             elif 'day' in rule:
-                entry_date = datetime.strptime(entry['date'], '%Y-%m-%d')
+                _, weekday, _, is_weekend = _parse_ymd(entry['date'])
                 if rule['value'] == 'weekend':
-                    return entry_date.weekday() >= 5
+                    return is_weekend
                 elif rule['value'] == 'weekday':
-                    return entry_date.weekday() < 5
+                    return not is_weekend
                 else:
-                    return entry_date.strftime('%A').lower() == rule['value'].lower()
+                    return weekday == rule['value'].lower()
             elif 'streak' in rule:
                 streak = context.get('streak', 0)
                 return compare_values(streak, float(rule['value']), rule['operator'])
@@ -69,22 +94,106 @@ def evaluate_rule(rule, entry, context):
         logger.error(f"Error evaluating rule: {str(e)}")
         return 0
 
-def load_data():
-    """Load entries from database"""
+def filter_entries(stmt, start_date=None, end_date=None, names=None):
+    """Restrict an entries statement to an ISO date range and a set of names"""
+    from .models import Entry
+    if start_date:
+        stmt = stmt.where(Entry.date >= start_date)
+    if end_date:
+        stmt = stmt.where(Entry.date <= end_date)
+    if names:
+        stmt = stmt.where(Entry.name.in_(names))
+    return stmt
+
+def load_data(start_date=None, end_date=None, names=None):
+    """Load entries from database, optionally filtered by ISO date range and names"""
     from .models import Entry  # Import moved inside function
-    db = SessionLocal()
+    # Plain column rows skip ORM instance construction and identity-map bookkeeping
+    stmt = filter_entries(select(
+        Entry.id, Entry.date, Entry.time, Entry.name, Entry.status,
+        Entry.timestamp, Entry.weekday, Entry.minute_of_day
+    ), start_date, end_date, names)
+    return [
+        {**row, "timestamp": row["timestamp"].isoformat()}
+        for row in Session().execute(stmt).mappings()
+    ]
+
+# Every imported entry must carry all of these; both import paths check them
+_IMPORT_ENTRY_FIELDS = ("id", "date", "time", "name", "status", "timestamp")
+
+def import_entry_rows(entries):
+    """Yield imported entries as row dicts, rejecting any with a missing field"""
+    for index, entry in enumerate(entries):
+        missing = [field for field in _IMPORT_ENTRY_FIELDS if entry.get(field) in (None, "")]
+        if missing:
+            raise ValueError(f"Entry {index} is missing {', '.join(missing)}")
+        # ISO timestamp strings from the export are parsed by Postgres on insert
+        yield {field: entry[field] for field in _IMPORT_ENTRY_FIELDS}
+
+def save_entries(entries, db, batch_size=1000, skip_duplicates=False):
+    """Bulk insert entry dicts as executemany batches on the given session"""
+    from .models import Entry  # Import moved inside function
+    if skip_duplicates:
+        # Rows clashing on id or (date, name) are dropped instead of aborting the batch
+        stmt = pg_insert(Entry).on_conflict_do_nothing()
+    else:
+        stmt = insert(Entry)
+    for batch in batched(entries, batch_size):
+        db.execute(stmt, batch)
+
+_CREATE_ENTRIES_IMPORT_SQL = text("""
+    CREATE TEMP TABLE entries_import (
+        id text, date text, time text, name text, status text, timestamp timestamp
+    ) ON COMMIT DROP
+""")
+_COPY_ENTRIES_IMPORT_SQL = "COPY entries_import FROM STDIN WITH (FORMAT csv)"
+# The entries trigger fills the derived columns; duplicates are dropped as in save_entries
+_MERGE_ENTRIES_IMPORT_SQL = text("""
+    INSERT INTO entries (id, date, time, name, status, timestamp)
+    SELECT id, date, time, name, status, timestamp
+    FROM entries_import
+    ON CONFLICT DO NOTHING
+""")
+
+def copy_entries(entries, db):
+    """Bulk load entry dicts through COPY into a staging table on the given session"""
+    buffer = io.StringIO()
+    csv.writer(buffer).writerows(
+        tuple(row.values()) for row in import_entry_rows(entries)
+    )
+    buffer.seek(0)
+    db.execute(_CREATE_ENTRIES_IMPORT_SQL)
+    # COPY needs the raw psycopg2 cursor of the session's connection
+    cursor = db.connection().connection.cursor()
     try:
-        entries = db.query(Entry).all()
-        return [{
-            "id": entry.id,
-            "date": entry.date,
-            "time": entry.time,
-            "name": entry.name,
-            "status": entry.status,
-            "timestamp": entry.timestamp.isoformat()
-        } for entry in entries]
+        cursor.copy_expert(_COPY_ENTRIES_IMPORT_SQL, buffer)
     finally:
-        db.close()
+        cursor.close()
+    db.execute(_MERGE_ENTRIES_IMPORT_SQL)
+
+class _UserScores:
+    """Per-user accumulator for calculate_scores; slots avoid a dict per user"""
+    __slots__ = ("early_bird_total", "last_in_total", "active_days", "base_points_total",
+                 "position_bonus_total", "streak_bonus_total", "arrival_minutes_total", "stats")
+
+    def __init__(self):
+        self.early_bird_total = 0
+        self.last_in_total = 0
+        self.active_days = 0
+        self.base_points_total = 0
+        self.position_bonus_total = 0
+        self.streak_bonus_total = 0
+        self.arrival_minutes_total = 0
+        # Returned as-is in each ranking, so it stays a dict
+        self.stats = {
+            "in_office": 0,
+            "remote": 0,
+            "sick": 0,
+            "leave": 0,
+            "days": 0,
+            "latest_arrivals": 0,
+            "arrival_times": []
+        }
 
 def calculate_scores(data, period, current_date, mode='last_in'):
     """Calculate scores with proper date validation"""
@@ -92,121 +201,108 @@ def calculate_scores(data, period, current_date, mode='last_in'):
     if mode not in ['last_in', 'early_bird']:
         logging.warning(f"Invalid mode '{mode}' provided to calculate_scores, defaulting to last_in")
         mode = 'last_in'
-        
+
     # Ensure current_date is not in the future
     now = datetime.now()
     if current_date > now:
         return []  # Return empty list for future dates
-        
+
     # Convert current_date to datetime if it's a string
     if isinstance(current_date, str):
         current_date = datetime.strptime(current_date, '%Y-%m-%d')
 
     # Get settings first
     settings = get_settings()
-    
-    # Group entries by date first
-    daily_entries = {}
-    daily_scores = {}
-    
-    # Filter entries for current period
-    filtered_entries = [entry for entry in data if in_period(entry, period, current_date)]
-    
-    # Group entries by date
-    for entry in filtered_entries:
-        date = entry["date"]
-        if date not in daily_entries:
-            daily_entries[date] = []
-        daily_entries[date].append(entry)
-    
+
+    daily_scores = defaultdict(_UserScores)
+
+    # Filter entries for current period; ISO dates compare correctly as strings
+    bounds = period_bounds(period, current_date)
+    if bounds:
+        start_iso, end_iso = bounds
+        filtered_entries = [entry for entry in data if start_iso <= entry["date"] <= end_iso]
+    else:
+        filtered_entries = list(data)
+
+    # One sort by (date, time) replaces per-day grouping and parsing; zero-padded
+    # HH:MM strings order the same as the times they represent
+    filtered_entries.sort(key=itemgetter("date", "time"))
+
+    # The request's session serves every score and streak lookup below
+    db = Session()
+    tiebreaker_wins = (get_tiebreaker_wins(db, filtered_entries)
+                       if settings.get("enable_tiebreakers", False) else None)
+    # Streak details for every ranked user come from one query, which also
+    # supplies the current lengths the scores need
+    streak_infos = get_current_streak_infos(
+        (entry["name"] for entry in filtered_entries), db)
+    streaks_by_user = current_streak_lengths(streak_infos)
+
     # Calculate scores for each day
-    for date, entries in daily_entries.items():
-        # Sort entries by time (always ascending)
-        entries.sort(key=lambda x: datetime.strptime(x["time"], "%H:%M"))
-        
+    for date, day_entries in groupby(filtered_entries, key=itemgetter("date")):
+        entries = list(day_entries)
         total_entries = len(entries)
         for position, entry in enumerate(entries, 1):
-            name = entry["name"]
-            if name not in daily_scores:
-                daily_scores[name] = {
-                    "early_bird_total": 0,
-                    "last_in_total": 0,
-                    "active_days": 0,
-                    "daily_scores": [],  # Add this line to store daily scores
-                    "base_points_total": 0,
-                    "position_bonus_total": 0,
-                    "streak_bonus_total": 0,
-                    "stats": {
-                        "in_office": 0,
-                        "remote": 0,
-                        "sick": 0,
-                        "leave": 0,
-                        "days": 0,
-                        "latest_arrivals": 0,
-                        "arrival_times": []
-                    }
-                }
-            
+            user = daily_scores[entry["name"]]
+            stats = user.stats
+
             # Calculate scores for both modes
-            scores = calculate_daily_score(entry, settings, position, total_entries, mode)
-            
-            status = entry["status"].replace("-", "_")
-            daily_scores[name]["stats"][status] += 1
-            daily_scores[name]["stats"]["days"] += 1
-            
-            if status in ["in_office", "remote"]:
-                daily_scores[name]["active_days"] += 1
-                
-                # Store individual daily scores
-                daily_scores[name]["daily_scores"].append({
-                    'date': date,
-                    'early_bird': scores["early_bird"],
-                    'last_in': scores["last_in"]
-                })
-                
-                daily_scores[name]["early_bird_total"] += scores["early_bird"]
-                daily_scores[name]["last_in_total"] += scores["last_in"]
-                daily_scores[name]["base_points_total"] += scores["base"]
-                daily_scores[name]["position_bonus_total"] += scores["position_bonus"]
-                daily_scores[name]["streak_bonus_total"] += scores["streak"]
-                
+            scores = calculate_daily_score(entry, settings, position, total_entries, mode,
+                                           now=now, db=db, tiebreaker_wins=tiebreaker_wins,
+                                           streaks_by_user=streaks_by_user)
+
+            status = normalize_status(entry["status"])
+            stats[status] += 1
+            stats["days"] += 1
+
+            if status in ("in_office", "remote"):
+                user.active_days += 1
+                user.early_bird_total += scores["early_bird"]
+                user.last_in_total += scores["last_in"]
+                user.base_points_total += scores["base"]
+                user.position_bonus_total += scores["position_bonus"]
+                user.streak_bonus_total += scores["streak"]
+
                 if (mode == 'last_in' and position == total_entries) or \
                    (mode == 'early_bird' and position == 1):
-                    daily_scores[name]["stats"]["latest_arrivals"] += 1
-                
-                arrival_time = datetime.strptime(entry["time"], "%H:%M")
-                daily_scores[name]["stats"]["arrival_times"].append(arrival_time)
-    
+                    stats["latest_arrivals"] += 1
+
+                # minute_of_day is stored at write time, so the time string is not re-parsed
+                minutes = entry["minute_of_day"]
+                stats["arrival_times"].append(
+                    datetime(*_ARRIVAL_BASE_DATE, *divmod(minutes, 60)))
+                user.arrival_minutes_total += minutes
+
     # Format rankings
     rankings = []
     for name, scores in daily_scores.items():
-        if scores["active_days"] > 0:
+        active_days = scores.active_days
+        if active_days > 0:
             # Calculate cumulative and average scores
-            early_bird_total = sum(day['early_bird'] for day in scores["daily_scores"])
-            last_in_total = sum(day['last_in'] for day in scores["daily_scores"])
-            early_bird_avg = early_bird_total / scores["active_days"]
-            last_in_avg = last_in_total / scores["active_days"]
-            
-            # Get streak info directly from streaks module
-            db = SessionLocal()
-            streak_info = get_current_streak_info(name, db)
-            
+            early_bird_total = scores.early_bird_total
+            last_in_total = scores.last_in_total
+            early_bird_avg = early_bird_total / active_days
+            last_in_avg = last_in_total / active_days
+
+            streak_info = streak_infos[name]
+
             rankings.append({
                 "name": name,
                 "score": last_in_avg if mode == 'last_in' else early_bird_avg,
                 "total_score": last_in_total if mode == 'last_in' else early_bird_total,
-                "total_base_points": scores["base_points_total"],
-                "total_position_bonus": scores["position_bonus_total"],
-                "total_streak_bonus": scores["streak_bonus_total"],
-                "base_points": scores["base_points_total"] / scores["active_days"],
-                "position_bonus": scores["position_bonus_total"] / scores["active_days"],
-                "streak_bonus": scores["streak_bonus_total"] / scores["active_days"],
+                "total_base_points": scores.base_points_total,
+                "total_position_bonus": scores.position_bonus_total,
+                "total_streak_bonus": scores.streak_bonus_total,
+                "base_points": scores.base_points_total / active_days,
+                "position_bonus": scores.position_bonus_total / active_days,
+                "streak_bonus": scores.streak_bonus_total / active_days,
                 "streak": streak_info['length'],
                 "streak_start": streak_info['start'],
                 "is_current_streak": streak_info['is_current'],
-                "stats": scores["stats"],
-                "average_arrival_time": calculate_average_time(scores["stats"]["arrival_times"]) if scores["stats"]["arrival_times"] else "N/A",
-                "days": scores["active_days"]
+                "stats": scores.stats,
+                # One arrival is recorded per active day, so the running total averages directly
+                "average_arrival_time": minutes_to_hhmm(scores.arrival_minutes_total // active_days),
+                "days": active_days
             })
 
     # Sort by correct score type based on points_mode
@@ -215,106 +311,73 @@ def calculate_scores(data, period, current_date, mode='last_in'):
     return rankings
 
 def get_settings():
-    """Get settings with proper object conversion"""
-    db = SessionLocal()
-    try:
-        settings = db.query(Settings).first()
-        if not settings:
-            return {
-                "points": {},
-                "late_bonus": 2.0,
-                "early_bonus": 2.0,
-                "remote_days": {},
-                "core_users": [],
-                "enable_streaks": False,
-                "streak_multiplier": 0.5,
-                "enable_tiebreakers": False,
-                "tiebreaker_points": 5
-            }
-        
-        # Always return a dictionary, not the Settings object
-        return {
-            "points": dict(settings.points or {}),
-            "late_bonus": float(settings.late_bonus or 2.0),
-            "early_bonus": float(settings.early_bonus or 2.0),
-            "remote_days": dict(settings.remote_days or {}),
-            "core_users": list(settings.core_users or []),
-            "enable_streaks": bool(settings.enable_streaks),
-            "streak_multiplier": float(settings.streak_multiplier or 0.5),
-            "enable_tiebreakers": bool(settings.enable_tiebreakers),
-            "tiebreaker_points": int(settings.tiebreaker_points or 5),
-            "tiebreaker_types": dict(settings.tiebreaker_types or {})
-        }
-    finally:
-        db.close()
+    """Scoring view of the request's settings, with scoring defaults applied"""
+    # get_request_settings already loads the row at most once per request
+    settings = get_request_settings()
+    return {
+        "points": dict(settings["points"] or {}),
+        "late_bonus": float(settings["late_bonus"] or 2.0),
+        "early_bonus": float(settings["early_bonus"] or 2.0),
+        "remote_days": dict(settings["remote_days"] or {}),
+        "core_users": list(settings["core_users"] or []),
+        "enable_streaks": bool(settings["enable_streaks"]),
+        "streak_multiplier": float(settings["streak_multiplier"] or 0.5),
+        "enable_tiebreakers": bool(settings["enable_tiebreakers"]),
+        "tiebreaker_points": int(settings["tiebreaker_points"] or 5),
+        "tiebreaker_types": dict(settings["tiebreaker_types"] or {})
+    }
 
-def calculate_daily_score(entry, settings, position=None, total_entries=None, mode='last_in'):
-    """Calculate score for a single day's entry with proper streak handling"""
-    # Ensure settings is a dict
-    if not isinstance(settings, dict):
-        settings = get_settings()
+_TIEBREAKER_WINS_SQL = text("""
+    SELECT p.username, t.period_end::date AS end_date, COUNT(*) AS wins
+    FROM tie_breakers t
+    JOIN tie_breaker_participants p ON t.id = p.tie_breaker_id
+    WHERE p.winner = true
+    AND t.status = 'completed'
+    AND t.period_end::date = ANY(CAST(:dates AS date[]))
+    AND p.username = ANY(:usernames)
+    GROUP BY p.username, end_date
+""")
 
-    # Get current date or use today as default
-    current_date = datetime.now()
+def get_tiebreaker_wins(db, entries):
+    """Map (username, ISO date) to completed tie-breaker wins for the given entries
 
-    entry_date = datetime.strptime(entry["date"], '%Y-%m-%d')
-    weekday = entry_date.strftime('%A').lower()
-    
-    # Fix settings access
-    points_dict = settings.points if isinstance(settings, Settings) else settings.get("points", {})
-    daily_shifts = points_dict.get("daily_shifts", {})
-    
-    # Get shift configuration for the current day
-    day_shift = daily_shifts.get(weekday, {
-        "hours": points_dict.get("shift_length", 9),
-        "start": "09:00"
+    One grouped query replaces the per-entry COUNT in calculate_daily_score.
+    """
+    if not entries:
+        return {}
+    result = db.execute(_TIEBREAKER_WINS_SQL, {
+        "dates": sorted({entry["date"] for entry in entries}),
+        "usernames": sorted({entry["name"] for entry in entries})
     })
+    return {(username, end_date.isoformat()): wins for username, end_date, wins in result}
 
-    # Access settings properties safely
-    if isinstance(settings, Settings):
-        points = settings.points
-        late_bonus = float(settings.late_bonus)
-        early_bonus = float(settings.early_bonus)
-        streak_multiplier = float(settings.streak_multiplier)
-        streaks_enabled = settings.enable_streaks
-        tiebreakers_enabled = settings.enable_tiebreakers
-    else:
-        points = settings.get("points", {})
-        late_bonus = float(settings.get("late_bonus", 2.0))
-        early_bonus = float(settings.get("early_bonus", 2.0))
-        streak_multiplier = float(settings.get("streak_multiplier", 0.5))
-        streaks_enabled = settings.get("enable_streaks", False)
-        tiebreakers_enabled = settings.get("enable_tiebreakers", False)
-
-    # Get base points based on status
-    status = entry["status"].replace("-", "_")
-    base_points = float(points.get(status, 0)) if isinstance(points, dict) else 0
-    
-    # Initialize context
-    context = {
-        'current_points': base_points,
-        'position': position,
-        'total_entries': total_entries,
-        'streak_multiplier': streak_multiplier
-    }
+def calculate_daily_score(entry, settings, position=None, total_entries=None, mode='last_in',
+                          now=None, db=None, tiebreaker_wins=None, streaks_by_user=None):
+    """Calculate score for a single day's entry with proper streak handling
 
-    # Get current streak from database instead of calculating
-    db = SessionLocal()
-    try:
-        streak = calculate_current_streak(entry["name"])
-        context['streak'] = streak
-    finally:
-        db.close()
+    Callers scoring many entries should pass ``now`` so the clock is read once,
+    ``db`` to use a session other than the request's, and the maps from
+    get_tiebreaker_wins and calculate_current_streaks so tie-breaker wins and
+    streaks are looked up rather than queried per entry.
+    """
+    if db is None:
+        db = Session()
+    return _score_entry(entry, settings, position, total_entries, mode, now, db,
+                        tiebreaker_wins, streaks_by_user)
+
+def _score_entry(entry, settings, position, total_entries, mode, now, db, tiebreaker_wins,
+                 streaks_by_user):
+    # Ensure settings is a dict
+    if not isinstance(settings, dict):
+        settings = get_settings()
 
-    # Modify late arrival logic to use configured start time
-    shift_start = datetime.strptime(day_shift["start"], "%H:%M").time()
-    entry_time = datetime.strptime(entry["time"], "%H:%M").time()
+    entry_date, _, day_name, _ = _parse_ymd(entry["date"])
     
-    is_late = entry_time > shift_start
+    # settings is always a dict by this point
+    points = settings.get("points", {})
 
-    # Check if it's a working day for this user
-    day_name = entry_date.strftime('%a').lower()
-    user_working_days = settings.get("points", {}).get("working_days", {}).get(entry["name"], ['mon','tue','wed','thu','fri'])
+    # Check if it's a working day for this user before doing any other work
+    user_working_days = points.get("working_days", {}).get(entry["name"], _DEFAULT_WORKING_DAYS)
     
     # If it's not a working day for this user, return zero points
     if day_name not in user_working_days:
@@ -331,9 +394,14 @@ def calculate_daily_score(entry, settings, position=None, total_entries=None, mo
             }
         }
 
+    # Get current date or use today as default
+    current_date = now or datetime.now()
+    late_bonus = float(settings.get("late_bonus", 2.0))
+    early_bonus = float(settings.get("early_bonus", 2.0))
+
     # Continue with existing scoring logic
-    status = entry["status"].replace("-", "_")
-    base_points = settings["points"][status]
+    status = normalize_status(entry["status"])
+    base_points = points[status]
     
     # Initialize context for rule evaluation
     context = {
@@ -346,16 +414,15 @@ def calculate_daily_score(entry, settings, position=None, total_entries=None, mo
         context['streak'] = 0
 
     # Apply custom rules if they exist
-    rules = settings["points"].get("rules", [])
+    rules = points.get("rules", [])
     if rules:
-        for rule in rules:
-            if rule['type'] == 'condition':
-                if evaluate_rule(rule, entry, context):
-                    # Find matching action
-                    action_rule = next((r for r in rules if r['type'] == 'action'), None)
-                    if action_rule:
-                        points_mod = evaluate_rule(action_rule, entry, context)
-                        context['current_points'] += points_mod
+        # Every matching condition applies the first action, so resolve it once
+        action_rule = next((r for r in rules if r['type'] == 'action'), None)
+        if action_rule:
+            for rule in rules:
+                if rule['type'] == 'condition' and evaluate_rule(rule, entry, context):
+                    points_mod = evaluate_rule(action_rule, entry, context)
+                    context['current_points'] += points_mod
 
     # Calculate standard bonuses
     early_bird_bonus = 0
@@ -381,22 +448,22 @@ def calculate_daily_score(entry, settings, position=None, total_entries=None, mo
     streak_bonus = 0
     
     if entry_date <= current_date:  # Only calculate streak for non-future dates
-        db = SessionLocal()
-        try:
-            streak = calculate_current_streak(entry["name"])
-            if streak > 0:
-                multiplier = settings.get("streak_multiplier", 0.5)
-                # Only apply streak bonus to score if streaks are enabled
-                if settings.get("enable_streaks", False):
-                    streak_bonus = -streak * multiplier if mode == 'last_in' else streak * multiplier
-        finally:
-            db.close()
+        if streaks_by_user is not None:
+            streak = streaks_by_user.get(entry["name"], 0)
+        else:
+            streak = calculate_current_streak(entry["name"], db)
+        if streak > 0:
+            multiplier = settings.get("streak_multiplier", 0.5)
+            # Only apply streak bonus to score if streaks are enabled
+            if settings.get("enable_streaks", False):
+                streak_bonus = -streak * multiplier if mode == 'last_in' else streak * multiplier
 
     # Apply tie breaker wins if enabled - Modified to use the exact date
     tie_breaker_points = 0
     if settings.get("enable_tiebreakers", False):
-        db = SessionLocal()
-        try:
+        if tiebreaker_wins is not None:
+            wins = tiebreaker_wins.get((entry["name"], entry["date"]), 0)
+        else:
             # Updated query to get wins specifically for ties that ended on this date
             wins = db.execute(text("""
                 SELECT COUNT(*) FROM tie_breakers t
@@ -409,14 +476,12 @@ def calculate_daily_score(entry, settings, position=None, total_entries=None, mo
                 "username": entry["name"],
                 "date": entry["date"]
             }).scalar()
-            
-            if wins > 0:
-                base_points = settings.get("tiebreaker_points", 5) * wins
-                # In last_in mode, subtract points for winning (penalize)
-                # In early_bird mode, add points for winning (reward)
-                tie_breaker_points = -base_points if mode == 'last_in' else base_points
-        finally:
-            db.close()
+
+        if wins > 0:
+            base_points = settings.get("tiebreaker_points", 5) * wins
+            # In last_in mode, subtract points for winning (penalize)
+            # In early_bird mode, add points for winning (reward)
+            tie_breaker_points = -base_points if mode == 'last_in' else base_points
 
     return {
         "last_in": context['current_points'] + last_in_bonus + (streak_bonus if settings.get("enable_streaks", False) else 0),
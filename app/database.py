@@ -1,18 +1,33 @@
 # database.py
 import os
 import logging
+import orjson
+import psycopg2.extras
 from sqlalchemy import create_engine, event
-from sqlalchemy.orm import sessionmaker, declarative_base
+from sqlalchemy.orm import declarative_base, scoped_session, sessionmaker
 from .config import get_database_url
 
 logger = logging.getLogger(__name__)
 
 Base = declarative_base()
 
+def _json_serializer(obj):
+    """Encode JSON column values (audit changes, settings) with orjson"""
+    return orjson.dumps(obj, option=orjson.OPT_NON_STR_KEYS).decode()
+
 engine = create_engine(
     get_database_url(),
     echo=False,
-    future=True
+    future=True,
+    query_cache_size=1200,
+    json_serializer=_json_serializer,
+    # Pool sizing is tunable per deployment; LIFO keeps the hot connections
+    # in use so idle ones can age out
+    pool_size=int(os.getenv('DB_POOL_SIZE', '5')),
+    max_overflow=int(os.getenv('DB_MAX_OVERFLOW', '10')),
+    pool_recycle=int(os.getenv('DB_POOL_RECYCLE', '1800')),
+    pool_use_lifo=True,
+    pool_reset_on_return='rollback'
 )
 
 SessionLocal = sessionmaker(
@@ -21,10 +36,13 @@ SessionLocal = sessionmaker(
     bind=engine
 )
 
-@event.listens_for(engine, "connect")
-def set_sqlite_pragma(dbapi_connection, connection_record):
-    # ...existing code if needed for SQLite...
-    pass
+# Request-scoped session for read paths; removed when the app context tears down
+Session = scoped_session(SessionLocal)
+
+# Register the json/jsonb typecasters once for every connection instead of
+# doing per-connection work in a "connect" listener; orjson does the decoding
+psycopg2.extras.register_default_json(globally=True, loads=orjson.loads)
+psycopg2.extras.register_default_jsonb(globally=True, loads=orjson.loads)
 
 if os.getenv('FLASK_ENV') == 'development':
     @event.listens_for(engine, "connect")
@@ -1,10 +1,19 @@
-from datetime import datetime, timedelta
+import calendar
+from datetime import date, datetime, time as dt_time, timedelta
+from decimal import Decimal
 from typing import Union, List, Dict, Any
+import orjson
+from flask import current_app
+from werkzeug.http import http_date
 from sqlalchemy import text
 from functools import wraps
+from itertools import islice
 import re
+import sys
+import time
 
 from .database import SessionLocal
+from .metrics import RESPONSE_TIME
 
 def format_date_range(start_date: datetime, end_date: datetime, period: str) -> str:
     """Format date range for display"""
@@ -16,9 +25,20 @@ def format_date_range(start_date: datetime, end_date: datetime, period: str) ->
         return start_date.strftime('%B %Y')
     return start_date.strftime('%d/%m/%Y')
 
+# Known statuses map straight to their interned normalized form
+_STATUS_MAP = {
+    raw: sys.intern(raw.replace("-", "_"))
+    for raw in ("in-office", "in_office", "remote", "sick", "leave")
+}
+
+_STATUS_TRANS = str.maketrans("-", "_")
+
 def normalize_status(status: str) -> str:
     """Normalize status strings"""
-    return status.replace("-", "_")
+    normalized = _STATUS_MAP.get(status)
+    if normalized is None:
+        normalized = status.translate(_STATUS_TRANS) if "-" in status else status
+    return normalized
 
 def calculate_average_time(times: List[datetime]) -> str:
     """Calculate average time from a list of datetime objects"""
@@ -31,35 +51,93 @@ def calculate_average_time(times: List[datetime]) -> str:
     except (AttributeError, TypeError):
         return "N/A"
 
+def parse_hhmm(time_str: str) -> int:
+    """Convert an "HH:MM" string to minutes since midnight"""
+    hours, minutes = time_str.split(":", 1)
+    return int(hours) * 60 + int(minutes)
+
+def minutes_to_hhmm(minutes: int) -> str:
+    """Format minutes since midnight as "HH:MM", wrapping past midnight"""
+    minutes %= 1440
+    return f"{minutes // 60:02d}:{minutes % 60:02d}"
+
+def batched(iterable, size):
+    """Yield lists of up to size items from iterable"""
+    iterator = iter(iterable)
+    while True:
+        batch = list(islice(iterator, size))
+        if not batch:
+            return
+        yield batch
+
+# Sorted keys and passed-through dates keep responses identical to jsonify's
+_JSON_OPTIONS = (orjson.OPT_NON_STR_KEYS | orjson.OPT_SORT_KEYS
+                 | orjson.OPT_PASSTHROUGH_DATETIME)
+
+def _json_default(obj):
+    """Encode the types orjson is told to pass through the way jsonify does"""
+    if isinstance(obj, date):
+        # Flask's encoder emits RFC 822 dates, e.g. "Mon, 08 Jan 2024 00:00:00 GMT"
+        return http_date(obj)
+    if isinstance(obj, dt_time):
+        return obj.isoformat()
+    if isinstance(obj, Decimal):
+        return float(obj)
+    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
+
+def json_dumps(obj) -> bytes:
+    """Serialize obj to JSON bytes with orjson, matching jsonify's output"""
+    return orjson.dumps(obj, default=_json_default, option=_JSON_OPTIONS)
+
+def json_response(payload, status=200):
+    """Build a JSON response serialized with orjson instead of jsonify"""
+    return current_app.response_class(json_dumps(payload), status=status,
+                                      mimetype='application/json')
+
 def track_response_time(route_name):
+    """Observe the wrapped view's duration in the response_time_seconds histogram"""
+    # Resolve the labelled child once at decoration time, not per request
+    response_time = RESPONSE_TIME.labels(endpoint=route_name)
+
     def decorator(f):
         @wraps(f)
         def wrapped(*args, **kwargs):
-            # Implementation
-            return f(*args, **kwargs)
+            start = time.perf_counter()
+            try:
+                return f(*args, **kwargs)
+            finally:
+                response_time.observe(time.perf_counter() - start)
         return wrapped
     return decorator
 
 def in_period(entry, period, current_date):
     """Check if entry falls within the specified period"""
     try:
-        entry_date = datetime.strptime(entry["date"], '%Y-%m-%d').date()
-        current = current_date.date() if isinstance(current_date, datetime) else current_date
-        
-        if period == 'day':
-            return entry_date == current
-        elif period == 'week':
-            # Get Monday of the current week
-            week_start = current - timedelta(days=current.weekday())
-            week_end = week_start + timedelta(days=6)  # Fix: Change days() to days
-            return week_start <= entry_date <= week_end
-        elif period == 'month':
-            # Check if same year and month
-            return entry_date.year == current.year and entry_date.month == current.month
-        return True
-    except (ValueError, AttributeError):
+        bounds = period_bounds(period, current_date)
+        if bounds is None:
+            return True
+        # Stored dates are zero-padded ISO strings, which order like the dates
+        start_iso, end_iso = bounds
+        return start_iso <= entry["date"] <= end_iso
+    except (AttributeError, KeyError, TypeError):
         return False
 
+def period_bounds(period, current_date):
+    """Return the (start, end) ISO date strings of the period, or None for all time"""
+    current = current_date.date() if isinstance(current_date, datetime) else current_date
+
+    if period == 'day':
+        start = end = current
+    elif period == 'week':
+        start = current - timedelta(days=current.weekday())
+        end = start + timedelta(days=6)
+    elif period == 'month':
+        start = current.replace(day=1)
+        end = current.replace(day=calendar.monthrange(current.year, current.month)[1])
+    else:
+        return None
+    return start.isoformat(), end.isoformat()
+
 def normalize_settings(settings_dict):
     """Normalize settings dictionary for consistent comparison"""
     # Extract point values, handling nested dictionaries
@@ -0,0 +1,33 @@
+import logging
+
+from .database import Base, engine
+from .migrations.run_migrations import get_pending_versions, run_migrations
+from .utils import init_settings
+
+logger = logging.getLogger(__name__)
+
+def init_db():
+    """Create missing tables, apply pending migrations and seed default settings"""
+    logger.info("Creating database tables if they don't exist.")
+    Base.metadata.create_all(bind=engine)
+
+    # A failure stops startup instead of running on a partially migrated schema
+    logger.info("Running migrations...")
+    run_migrations()
+
+    logger.info("Initializing default settings...")
+    init_settings()
+
+def check_db():
+    """Fail fast when the schema is missing or behind the code's migrations"""
+    pending = get_pending_versions()
+    if pending:
+        raise RuntimeError(
+            f"Database schema is not initialised; pending migrations: {', '.join(pending)}. "
+            "Run `python -m app.init_db` or start with RUN_DB_INIT=1."
+        )
+
+if __name__ == "__main__":
+    # Runs against the engine only; the Flask app is never created here
+    logging.basicConfig(level=logging.INFO)
+    init_db()
@@ -1,38 +1,63 @@
 # metrics.py
-from prometheus_client import make_wsgi_app, Summary, Counter, Gauge, Histogram, CollectorRegistry
+from prometheus_client import (REGISTRY, make_wsgi_app, start_http_server, Summary, Counter, Gauge,
+                               Histogram, CollectorRegistry)
+import os
 import time
 from threading import Thread
-from .database import SessionLocal
+from sqlalchemy import event
+from .database import SessionLocal, engine
 import logging
 
 logger = logging.getLogger(__name__)
 
 registry = CollectorRegistry()
 
-# Define your custom Prometheus metrics here
+# Under gunicorn each worker is a separate process; with PROMETHEUS_MULTIPROC_DIR
+# set, every worker writes its samples there and multiprocess_mode says how
+# gauges from different workers are combined
 REQUEST_TIME = Summary('request_processing_seconds', 'Time spent processing request')
 REQUEST_COUNT = Counter('request_count', 'Total request count')
-IN_PROGRESS = Gauge('in_progress_requests', 'In-progress requests')
-ATTENDANCE_COUNT = Gauge('attendance_count_total', 'Total attendance records', ['status'])
+IN_PROGRESS = Gauge('in_progress_requests', 'In-progress requests', multiprocess_mode='livesum')
+ATTENDANCE_COUNT = Gauge('attendance_count_total', 'Total attendance records', ['status'],
+                         multiprocess_mode='max')
 RESPONSE_TIME = Histogram('response_time_seconds', 'Response time in seconds', ['endpoint'])
 AUDIT_ACTIONS = Counter('audit_actions_total', 'Total audit actions', ['action'])
-DB_CONNECTIONS = Gauge('db_connections', 'Number of current DB connections')
+DB_CONNECTIONS = Gauge('db_connections', 'Number of current DB connections', multiprocess_mode='livesum')
 AUDIT_TRAIL_COUNT = Counter('audit_trail_count', 'Total audit logs recorded')
 ATTENDANCE_DB_COUNT = Counter('attendance_db_count', 'Attendance DB operations', ['operation'])
 RANKING_CALLS = Counter('ranking_calls_total', 'Number of times rankings have been requested', registry=registry)
 
-USER_STREAK = Gauge('user_streak_days', 'Current streak for user', ['username'], registry=registry)
+# Pool events keep the gauge current; set_function() isn't collected across processes
+event.listen(engine, 'checkout', lambda *args: DB_CONNECTIONS.inc())
+event.listen(engine, 'checkin', lambda *args: DB_CONNECTIONS.dec())
 
-# The WSGI metrics app for /metrics
+# The WSGI metrics app, still mounted by the legacy app/app.py
 metrics_app = make_wsgi_app()
 
+METRICS_PORT = int(os.getenv('METRICS_PORT', '9100'))
+
+def start_metrics_server(port=METRICS_PORT):
+    """Serve /metrics on its own port so scrapes never occupy a request worker
+
+    In multiprocess mode the gunicorn master serves every worker's samples
+    (see gunicorn.conf.py), so workers don't start a server of their own.
+    """
+    if 'PROMETHEUS_MULTIPROC_DIR' in os.environ:
+        return
+    try:
+        start_http_server(port, registry=REGISTRY)
+        logger.info("Serving metrics on port %s", port)
+    except OSError as e:
+        # Another process on this host already bound the port
+        logger.info("Metrics port %s unavailable, not serving metrics here: %s", port, e)
+
 def start_metrics_updater():
     def update_loop():
         while True:
             try:
                 update_prometheus_metrics()
             except Exception as e:
-                logger.error(f"Error updating metrics: {str(e)}")
+                logger.error("Error updating metrics: %s", e)
             time.sleep(300)  # Update every 5 minutes
 
     thread = Thread(target=update_loop, daemon=True)
@@ -42,18 +67,13 @@ def update_prometheus_metrics():
     db = SessionLocal()
     try:
         # Import models inside function to avoid circular imports
-        from .models import Entry, UserStreak
+        from .models import Entry
         
         # Update attendance_count_total by status
         statuses = ['in-office','remote','sick','leave']
         for s in statuses:
             count = db.query(Entry).filter(Entry.status == s).count()
             ATTENDANCE_COUNT.labels(status=s).set(count)
-
-        # Update user_streak_days
-        streaks = db.query(UserStreak).all()
-        for us in streaks:
-            USER_STREAK.labels(username=us.username).set(us.current_streak)
     finally:
         db.close()
 
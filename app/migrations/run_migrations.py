@@ -1,11 +1,24 @@
 import logging
 import os
 import importlib
-from sqlalchemy import create_engine, inspect, text
-from ..database import SessionLocal
+from sqlalchemy import text
+from ..database import engine
 
 logger = logging.getLogger(__name__)
 
+# Applied versions are recorded so each migration is checked at most once
+_CREATE_SCHEMA_MIGRATIONS = text("""
+    CREATE TABLE IF NOT EXISTS schema_migrations (
+        version TEXT PRIMARY KEY,
+        applied_at TIMESTAMP DEFAULT now()
+    )
+""")
+_APPLIED_VERSIONS = text("SELECT version FROM schema_migrations")
+_RECORD_VERSION = text("""
+    INSERT INTO schema_migrations (version) VALUES (:version)
+    ON CONFLICT (version) DO NOTHING
+""")
+
 def get_migration_versions():
     """Get list of migration versions"""
     versions_dir = os.path.join(os.path.dirname(__file__), 'versions')
@@ -18,40 +31,48 @@ def get_migration_versions():
     
     return migrations
 
+def get_applied_versions():
+    """Create the bookkeeping table if needed and return the recorded versions"""
+    with engine.begin() as conn:
+        conn.execute(_CREATE_SCHEMA_MIGRATIONS)
+        return set(conn.execute(_APPLIED_VERSIONS).scalars())
+
+def get_pending_versions():
+    """Migration versions not yet recorded, without creating anything"""
+    with engine.connect() as conn:
+        if not conn.execute(text("SELECT to_regclass('schema_migrations') IS NOT NULL")).scalar():
+            return get_migration_versions()
+        applied = set(conn.execute(_APPLIED_VERSIONS).scalars())
+    return [version for version in get_migration_versions() if version not in applied]
+
 def run_migrations():
-    """Run all database migrations in order"""
-    db = SessionLocal()
-    try:
-        logger.info("Running database migrations...")
-        
-        # Get all migration versions
-        migrations = get_migration_versions()
-        
-        for migration_name in migrations:
-            try:
-                migration = importlib.import_module(f'app.migrations.versions.{migration_name}')
-                if hasattr(migration, 'should_run'):
-                    if migration.should_run(db.get_bind()):
-                        logger.info(f"Running migration: {migration_name}")
-                        migration.migrate(db.get_bind())
-                        logger.info(f"Completed migration: {migration_name}")
-                    else:
-                        logger.info(f"Skipping migration {migration_name} - already applied")
+    """Run all pending database migrations in order"""
+    logger.info("Running database migrations...")
+    applied = get_applied_versions()
+    
+    for migration_name in get_migration_versions():
+        if migration_name in applied:
+            continue
+        try:
+            migration = importlib.import_module(f'app.migrations.versions.{migration_name}')
+            if hasattr(migration, 'should_run'):
+                if migration.should_run(engine):
+                    logger.info(f"Running migration: {migration_name}")
+                    migration.migrate(engine)
+                    logger.info(f"Completed migration: {migration_name}")
                 else:
-                    logger.warning(f"Migration {migration_name} has no should_run check")
-                    migration.migrate(db.get_bind())
-            except Exception as e:
-                logger.error(f"Error in migration {migration_name}: {e}")
-                raise
-        
-        logger.info("All migrations completed successfully")
-        
-    except Exception as e:
-        db.rollback()
-        logger.error(f"Migration error: {e}")
-        raise
-    finally:
-        db.close()
+                    logger.info(f"Skipping migration {migration_name} - already applied")
+            else:
+                logger.warning(f"Migration {migration_name} has no should_run check")
+                migration.migrate(engine)
+            
+            with engine.begin() as conn:
+                conn.execute(_RECORD_VERSION, {"version": migration_name})
+        except Exception as e:
+            logger.error(f"Error in migration {migration_name}: {e}")
+            raise
+    
+    logger.info("All migrations completed successfully")
 
 if __name__ == "__main__":
     run_migrations()
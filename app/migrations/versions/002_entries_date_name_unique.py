@@ -0,0 +1,66 @@
+import logging
+import os
+
+from sqlalchemy import text
+
+logger = logging.getLogger(__name__)
+
+def should_run(engine):
+    """Check if migration should run"""
+    with engine.connect() as conn:
+        result = conn.execute(text("""
+            SELECT to_regclass('entries') IS NOT NULL
+               AND NOT EXISTS (
+                   SELECT 1
+                   FROM pg_indexes
+                   WHERE indexname = 'ix_entries_date_name'
+               )
+        """))
+        return bool(result.scalar())
+
+# Every (date, name) pair stored more than once, with how many rows it has
+_DUPLICATE_PAIRS_SQL = text("""
+    SELECT date, name, count(*) AS copies
+    FROM entries
+    GROUP BY date, name
+    HAVING count(*) > 1
+    ORDER BY date, name
+""")
+
+# Keeps the earliest-logged row of each pair; rows without a timestamp sort
+# last and id only breaks exact ties
+_DELETE_LATER_DUPLICATES_SQL = text("""
+    DELETE FROM entries e
+    USING entries keep
+    WHERE keep.date = e.date
+      AND keep.name = e.name
+      AND (COALESCE(keep.timestamp, 'infinity'), keep.id)
+        < (COALESCE(e.timestamp, 'infinity'), e.id)
+""")
+
+def migrate(engine):
+    """Enforce one entry per person per day so inserts can use ON CONFLICT"""
+    with engine.begin() as conn:
+        # Older import and logging paths could store the same person twice on
+        # one day. Those rows are attendance records, so they are only removed
+        # when an operator opts in with DEDUPE_ENTRIES=1 after reviewing them.
+        duplicates = conn.execute(_DUPLICATE_PAIRS_SQL).all()
+        if duplicates:
+            pairs = ", ".join(
+                f"{row.date} {row.name} (x{row.copies})" for row in duplicates
+            )
+            if os.getenv('DEDUPE_ENTRIES', '0') != '1':
+                raise RuntimeError(
+                    f"Cannot add ix_entries_date_name: {len(duplicates)} (date, name) "
+                    f"pairs have duplicate entries: {pairs}. Resolve them, or set "
+                    "DEDUPE_ENTRIES=1 to keep only the earliest entry of each pair."
+                )
+            removed = conn.execute(_DELETE_LATER_DUPLICATES_SQL).rowcount
+            logger.warning(
+                "Removed %s duplicate entries, keeping the earliest of each pair: %s",
+                removed, pairs
+            )
+        conn.execute(text("""
+            CREATE UNIQUE INDEX IF NOT EXISTS ix_entries_date_name
+            ON entries (date, name)
+        """))
@@ -0,0 +1,29 @@
+from sqlalchemy import text
+
+def should_run(engine):
+    """Check if migration should run"""
+    with engine.connect() as conn:
+        result = conn.execute(text("""
+            SELECT to_regclass('entries') IS NOT NULL
+               AND NOT EXISTS (
+                   SELECT 1
+                   FROM information_schema.columns
+                   WHERE table_name = 'entries'
+                     AND column_name = 'date_ord'
+               )
+        """))
+        return bool(result.scalar())
+
+def migrate(engine):
+    """Add integer date/time columns to entries.
+
+    Migration 011 installs the trigger that computes them and backfills the
+    existing rows through it.
+    """
+    with engine.begin() as conn:
+        conn.execute(text("""
+            ALTER TABLE entries
+                ADD COLUMN IF NOT EXISTS date_ord INTEGER,
+                ADD COLUMN IF NOT EXISTS weekday INTEGER,
+                ADD COLUMN IF NOT EXISTS minute_of_day INTEGER
+        """))
@@ -0,0 +1,22 @@
+from sqlalchemy import text
+
+def should_run(engine):
+    """Check if migration should run"""
+    with engine.connect() as conn:
+        result = conn.execute(text("""
+            SELECT to_regclass('entries') IS NOT NULL
+               AND NOT EXISTS (
+                   SELECT 1
+                   FROM pg_indexes
+                   WHERE indexname = 'ix_entries_status_date'
+               )
+        """))
+        return bool(result.scalar())
+
+def migrate(engine):
+    """Index entries by (status, date) for status-filtered date range queries"""
+    with engine.begin() as conn:
+        conn.execute(text("""
+            CREATE INDEX IF NOT EXISTS ix_entries_status_date
+            ON entries (status, date)
+        """))
@@ -0,0 +1,22 @@
+from sqlalchemy import text
+
+def should_run(engine):
+    """Check if migration should run"""
+    with engine.connect() as conn:
+        result = conn.execute(text("""
+            SELECT to_regclass('audit_log') IS NOT NULL
+               AND NOT EXISTS (
+                   SELECT 1
+                   FROM pg_indexes
+                   WHERE indexname = 'ix_audit_log_timestamp_user_action'
+               )
+        """))
+        return bool(result.scalar())
+
+def migrate(engine):
+    """Index audit_log for newest-first paging with user/action filters"""
+    with engine.begin() as conn:
+        conn.execute(text("""
+            CREATE INDEX IF NOT EXISTS ix_audit_log_timestamp_user_action
+            ON audit_log (timestamp DESC, "user", action)
+        """))
@@ -0,0 +1,30 @@
+from sqlalchemy import text
+
+def should_run(engine):
+    """Check if migration should run"""
+    with engine.connect() as conn:
+        result = conn.execute(text("""
+            SELECT to_regclass('tie_breakers') IS NOT NULL
+               AND to_regclass('tie_breaker_participants') IS NOT NULL
+               AND (SELECT COUNT(*)
+                    FROM pg_indexes
+                    WHERE indexname IN ('ix_tie_breakers_completed_end_date',
+                                        'ix_tie_breaker_participants_winner')) < 2
+        """))
+        return bool(result.scalar())
+
+def migrate(engine):
+    """Partially index completed tie-breakers and winners for the wins count"""
+    with engine.begin() as conn:
+        conn.execute(text("""
+            CREATE INDEX IF NOT EXISTS ix_tie_breakers_completed_end_date
+            ON tie_breakers ((period_end::date))
+            WHERE status = 'completed'
+        """))
+        conn.execute(text("""
+            CREATE INDEX IF NOT EXISTS ix_tie_breaker_participants_winner
+            ON tie_breaker_participants (username, tie_breaker_id)
+            WHERE winner
+        """))
+        conn.execute(text("ANALYZE tie_breakers"))
+        conn.execute(text("ANALYZE tie_breaker_participants"))
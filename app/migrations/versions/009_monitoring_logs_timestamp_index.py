@@ -0,0 +1,22 @@
+from sqlalchemy import text
+
+def should_run(engine):
+    """Check if migration should run"""
+    with engine.connect() as conn:
+        result = conn.execute(text("""
+            SELECT to_regclass('monitoring_logs') IS NOT NULL
+               AND NOT EXISTS (
+                   SELECT 1
+                   FROM pg_indexes
+                   WHERE indexname = 'ix_monitoring_logs_timestamp'
+               )
+        """))
+        return bool(result.scalar())
+
+def migrate(engine):
+    """Index monitoring_logs for newest-first keyset paging"""
+    with engine.begin() as conn:
+        conn.execute(text("""
+            CREATE INDEX IF NOT EXISTS ix_monitoring_logs_timestamp
+            ON monitoring_logs (timestamp DESC, id DESC)
+        """))
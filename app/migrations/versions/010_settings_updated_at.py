@@ -0,0 +1,28 @@
+from sqlalchemy import text
+
+def should_run(engine):
+    """Check if migration should run"""
+    with engine.connect() as conn:
+        result = conn.execute(text("""
+            SELECT to_regclass('settings') IS NOT NULL
+               AND NOT EXISTS (
+                   SELECT 1
+                   FROM information_schema.columns
+                   WHERE table_name = 'settings'
+                     AND column_name = 'updated_at'
+               )
+        """))
+        return bool(result.scalar())
+
+def migrate(engine):
+    """Add the settings version timestamp used by the settings cache"""
+    with engine.begin() as conn:
+        conn.execute(text("""
+            ALTER TABLE settings
+                ADD COLUMN IF NOT EXISTS updated_at TIMESTAMP
+        """))
+        conn.execute(text("""
+            UPDATE settings
+            SET updated_at = now()
+            WHERE updated_at IS NULL
+        """))
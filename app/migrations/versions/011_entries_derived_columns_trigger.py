@@ -0,0 +1,51 @@
+from sqlalchemy import text
+
+def should_run(engine):
+    """Check if migration should run"""
+    with engine.connect() as conn:
+        result = conn.execute(text("""
+            SELECT to_regclass('entries') IS NOT NULL
+               AND NOT EXISTS (
+                   SELECT 1
+                   FROM pg_trigger
+                   WHERE tgname = 'trg_entries_derived_columns'
+               )
+        """))
+        return bool(result.scalar())
+
+def migrate(engine):
+    """Have Postgres maintain the derived entry columns on every write path"""
+    with engine.begin() as conn:
+        # The single definition of the derived columns: Python's
+        # date.toordinal(), date.weekday() (Monday = 0) and minutes since midnight
+        conn.execute(text("""
+            CREATE OR REPLACE FUNCTION entries_set_derived_columns() RETURNS trigger AS $$
+            BEGIN
+                NEW.date_ord := (NEW.date::date - DATE '0001-01-01') + 1;
+                NEW.weekday := EXTRACT(ISODOW FROM NEW.date::date)::int - 1;
+                NEW.minute_of_day := split_part(NEW.time, ':', 1)::int * 60
+                                   + split_part(NEW.time, ':', 2)::int;
+                RETURN NEW;
+            END;
+            $$ LANGUAGE plpgsql
+        """))
+        conn.execute(text("""
+            DROP TRIGGER IF EXISTS trg_entries_derived_columns ON entries
+        """))
+        conn.execute(text("""
+            CREATE TRIGGER trg_entries_derived_columns
+            BEFORE INSERT OR UPDATE OF date, time ON entries
+            FOR EACH ROW EXECUTE FUNCTION entries_set_derived_columns()
+        """))
+        # Backfill through the trigger: assigning date fires UPDATE OF date
+        conn.execute(text("""
+            UPDATE entries
+            SET date = date
+            WHERE date_ord IS NULL OR weekday IS NULL OR minute_of_day IS NULL
+        """))
+        conn.execute(text("""
+            ALTER TABLE entries
+                ALTER COLUMN date_ord SET NOT NULL,
+                ALTER COLUMN weekday SET NOT NULL,
+                ALTER COLUMN minute_of_day SET NOT NULL
+        """))
@@ -0,0 +1,45 @@
+from sqlalchemy import text
+
+def should_run(engine):
+    """Check if migration should run"""
+    with engine.connect() as conn:
+        result = conn.execute(text("""
+            SELECT to_regclass('entries') IS NOT NULL
+               AND NOT EXISTS (
+                   SELECT 1
+                   FROM pg_trigger
+                   WHERE tgname = 'trg_entries_bump_version'
+               )
+        """))
+        return bool(result.scalar())
+
+def migrate(engine):
+    """Count writes to entries so every worker can key its caches on them"""
+    with engine.begin() as conn:
+        conn.execute(text("""
+            CREATE TABLE IF NOT EXISTS data_versions (
+                name TEXT PRIMARY KEY,
+                version BIGINT NOT NULL DEFAULT 0
+            )
+        """))
+        conn.execute(text("""
+            INSERT INTO data_versions (name) VALUES ('entries')
+            ON CONFLICT (name) DO NOTHING
+        """))
+        # Statement-level, so a bulk import or TRUNCATE bumps the version once
+        conn.execute(text("""
+            CREATE OR REPLACE FUNCTION entries_bump_version() RETURNS trigger AS $$
+            BEGIN
+                UPDATE data_versions SET version = version + 1 WHERE name = 'entries';
+                RETURN NULL;
+            END;
+            $$ LANGUAGE plpgsql
+        """))
+        conn.execute(text("""
+            DROP TRIGGER IF EXISTS trg_entries_bump_version ON entries
+        """))
+        conn.execute(text("""
+            CREATE TRIGGER trg_entries_bump_version
+            AFTER INSERT OR UPDATE OR DELETE OR TRUNCATE ON entries
+            FOR EACH STATEMENT EXECUTE FUNCTION entries_bump_version()
+        """))
@@ -4,19 +4,10 @@ import uuid
 from datetime import datetime, timedelta
 
 from sqlalchemy import (Column, String, Integer, DateTime, Date, Float, JSON,
-                       Boolean)
+                       Boolean, FetchedValue, Index, text)
 from sqlalchemy.orm import relationship
 
-from .database import Base, SessionLocal
-
-def get_core_users():
-    """Get list of core users from settings"""
-    db = SessionLocal()
-    try:
-        settings = db.query(Settings).first()
-        return settings.core_users if settings else []
-    finally:
-        db.close()
+from .database import Base
 
 class Entry(Base):
     __tablename__ = 'entries'
@@ -26,6 +17,25 @@ class Entry(Base):
     name = Column(String, nullable=False)
     status = Column(String, nullable=False)
     timestamp = Column(DateTime, default=datetime.now)
+    # Parsed once at write time so analytics never re-parse date/time strings.
+    # Migration 011's trigger is the only place they are computed, for every
+    # write path; the app never sets them
+    date_ord = Column(Integer, nullable=False, server_default=FetchedValue(),
+                      server_onupdate=FetchedValue())
+    weekday = Column(Integer, nullable=False, server_default=FetchedValue(),
+                     server_onupdate=FetchedValue())
+    minute_of_day = Column(Integer, nullable=False, server_default=FetchedValue(),
+                           server_onupdate=FetchedValue())
+
+    __table_args__ = (
+        Index('ix_entries_date_name', 'date', 'name', unique=True),
+        # Serves history's keyset pagination (scanned backwards for DESC order)
+        Index('ix_entries_date_time_id', 'date', 'time', 'id'),
+        # Serves status IN (...) filters combined with a date range
+        Index('ix_entries_status_date', 'status', 'date'),
+        # Serves per-user scans ordered by day, such as the current streak
+        Index('ix_entries_name_date_ord', 'name', 'date_ord'),
+    )
 
 class User(Base):
     __tablename__ = "users"
@@ -51,6 +61,8 @@ class Settings(Base):
     tiebreaker_monthly = Column(Boolean, default=True)
     tiebreaker_types = Column(JSON)
     monitoring_start_date = Column(Date)
+    # Bumped on every ORM update; load_settings() keys its cache on it
+    updated_at = Column(DateTime, default=datetime.now, onupdate=datetime.now)
 
     def get(self, key, default=None):
         """Add get method to make Settings behave like a dict"""
@@ -85,6 +97,11 @@ class AuditLog(Base):
     details = Column(String)
     changes = Column(JSON, nullable=True)  # Make sure nullable is True
 
+    __table_args__ = (
+        # Serves the audit page's newest-first listing and its user/action filters
+        Index('ix_audit_log_timestamp_user_action', timestamp.desc(), user, action),
+    )
+
     def __repr__(self):
         return f"<AuditLog {self.action} by {self.user} at {self.timestamp}>"
 
@@ -111,6 +128,12 @@ class TieBreaker(Base):
     resolved_at = Column(DateTime, nullable=True)
     # e.g. points_applied if you have it
 
+    __table_args__ = (
+        # Serves the per-day count of completed tie-breaker wins
+        Index('ix_tie_breakers_completed_end_date', text('(period_end::date)'),
+              postgresql_where=text("status = 'completed'")),
+    )
+
 class TieBreakerParticipant(Base):
     __tablename__ = 'tie_breaker_participants'
     id = Column(Integer, primary_key=True, autoincrement=True)
@@ -120,6 +143,11 @@ class TieBreakerParticipant(Base):
     ready = Column(Boolean, default=False)
     winner = Column(Boolean, default=False)
 
+    __table_args__ = (
+        Index('ix_tie_breaker_participants_winner', 'username', 'tie_breaker_id',
+              postgresql_where=text('winner')),
+    )
+
 class TieBreakerGame(Base):
     __tablename__ = 'tie_breaker_games'
     id = Column(Integer, primary_key=True, autoincrement=True)
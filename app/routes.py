@@ -1,43 +1,48 @@
 import secrets
-from functools import wraps
+from functools import lru_cache, wraps
 import os
 from werkzeug.utils import safe_join
 
+# Template filters are pure functions of their input, so each one memoizes
+# its results; report pages render the same few values many times over
+@lru_cache(maxsize=4096)
+def _time_to_minutes(time_str):
+    """Convert time string (HH:MM) to minutes since midnight"""
+    if not time_str:
+        return 0
+    try:
+        hours, minutes = map(int, time_str.split(':'))
+        return hours * 60 + minutes
+    except (ValueError, AttributeError):
+        return 0
+
+@lru_cache(maxsize=4096)
+def _minutes_to_time(minutes):
+    """Convert minutes since midnight to HH:MM format"""
+    if not minutes:
+        return "00:00"
+    try:
+        hours = int(minutes) // 60
+        mins = int(minutes) % 60
+        return f"{hours:02d}:{mins:02d}"
+    except (ValueError, TypeError):
+        return "00:00"
+
+@lru_cache(maxsize=4096)
+def _format_date(value):
+    """Format date for template display"""
+    if isinstance(value, str):
+        try:
+            value = date.fromisoformat(value)
+        except ValueError:
+            return value
+    return value.strftime('%d/%m/%Y') if value else ''
+
 def init_app(app):
     """Initialize Flask app with filters and context processors"""
-    
-    @app.template_filter('time_to_minutes')
-    def time_to_minutes(time_str):
-        """Convert time string (HH:MM) to minutes since midnight"""
-        if not time_str:
-            return 0
-        try:
-            hours, minutes = map(int, time_str.split(':'))
-            return hours * 60 + minutes
-        except (ValueError, AttributeError):
-            return 0
-    
-    @app.template_filter('minutes_to_time')
-    def minutes_to_time(minutes):
-        """Convert minutes since midnight to HH:MM format"""
-        if not minutes:
-            return "00:00"
-        try:
-            hours = int(minutes) // 60
-            mins = int(minutes) % 60
-            return f"{hours:02d}:{mins:02d}"
-        except (ValueError, TypeError):
-            return "00:00"
-    
-    @app.template_filter('format_date')
-    def format_date(value):
-        """Format date for template display"""
-        if isinstance(value, str):
-            try:
-                value = datetime.strptime(value, '%Y-%m-%d').date()
-            except ValueError:
-                return value
-        return value.strftime('%d/%m/%Y') if value else ''
+    app.add_template_filter(_time_to_minutes, 'time_to_minutes')
+    app.add_template_filter(_minutes_to_time, 'minutes_to_time')
+    app.add_template_filter(_format_date, 'format_date')
 
     @app.template_filter('format_time')
     def format_time(value):
@@ -46,7 +51,7 @@ def init_app(app):
             return ''
         try:
             if isinstance(value, str):
-                time = datetime.strptime(value, '%H:%M').time()
+                time = dt_time.fromisoformat(value)
             else:
                 time = value
             return time.strftime('%H:%M')
@@ -62,7 +67,7 @@ def init_app(app):
             
         def get_setting(key, default=None):
             """Get a setting value with fallback"""
-            settings = load_settings()
+            settings = get_request_settings()
             return settings.get(key, default)
             
         return {
@@ -74,46 +79,52 @@ def init_app(app):
 import json
 import logging
 import uuid
+from bisect import bisect_right
 from collections import defaultdict
 from datetime import date, datetime, timedelta
+from datetime import time as dt_time
 from decimal import Decimal
+from operator import itemgetter
 from threading import Lock, Thread
 
 from flask import Blueprint
 from flask import \
     current_app as app  # Use current_app instead of direct import
-from flask import jsonify, redirect, render_template, request, session, url_for, send_from_directory
-from sqlalchemy import inspect, text
+from flask import (jsonify, redirect, render_template, request, session,
+                   send_from_directory, stream_with_context, url_for)
+from sqlalchemy import (bindparam, delete, exists, func, insert, inspect, select,
+                        text, tuple_, update)
+from sqlalchemy.dialects.postgresql import insert as pg_insert
 
+from .audit import enqueue_audit
 from .blueprints import \
     bp  # Import bp from blueprints instead of creating it here
-from .caching import HashableCacheWithMetrics
+from .caching import HashableCacheWithMetrics, ttl_cache
 from .chatbot import EnhancedQueryProcessor  # Add this line
 from .data import (calculate_daily_score, calculate_scores, decimal_to_float,
-                   load_data, get_settings)  # Add get_settings here
-from .database import SessionLocal
+                   copy_entries, get_tiebreaker_wins, import_entry_rows, load_data, get_settings, save_entries)  # Add get_settings here
+from .database import Session, SessionLocal, engine
 # from your local modules
 from .game import (apply_move, check_connect4_winner, check_tictactoe_winner,
                    check_winner, create_test_games, is_valid_move)
-from .helpers import (format_date_range, in_period, normalize_settings,
-                      normalize_status, track_response_time)
+from .helpers import (batched, format_date_range, in_period, json_dumps,
+                      json_response, minutes_to_hhmm,
+                      normalize_settings, normalize_status, parse_hhmm, period_bounds,
+                      track_response_time)
 from .metrics import (ATTENDANCE_COUNT, AUDIT_ACTIONS, IN_PROGRESS,
                       RANKING_CALLS, REQUEST_COUNT, REQUEST_TIME,
                       RESPONSE_TIME)
 from .models import (AuditLog, Entry, Settings, TieBreaker, TieBreakerGame,
-                     TieBreakerParticipant, User, UserStreak, get_core_users)
+                     TieBreakerParticipant, User, UserStreak)
 from .sockets import notify_game_update, socketio
 from .tie_breakers import (check_tie_breaker_completion, create_game,
                            create_next_game, create_next_game_after_draw,
                            create_test_tie_breaker, determine_winner)
-from .utils import init_settings, load_settings
-from .visualisation import (calculate_arrival_patterns, calculate_average_time,
-                            calculate_daily_activity, calculate_daily_score,
-                            calculate_points_progression,
-                            calculate_status_counts, calculate_user_comparison,
-                            calculate_weekly_patterns, analyze_early_arrivals,
-                            analyze_late_arrivals)
-from .streaks import calculate_current_streak, get_streak_history, get_attendance_for_period, get_current_streak_info
+from .utils import (get_core_users, get_request_settings, init_settings,
+                    load_settings, settings_for_version)
+from .visualisation import (calculate_points_progression, query_daily_activity,
+                            query_status_counts, summarize_attendance)
+from .streaks import bulk_update_streaks, calculate_current_streak, calculate_current_streaks, current_streak_lengths, get_streak_history, get_attendance_for_period, get_current_streak_infos
 
 # If you need to call methods from your main app or from 'app.py' directly, 
 # you typically do that through current_app from flask, or separate your code further.
@@ -152,13 +163,45 @@ def register_template_filters(app):
         """Format date for template display"""
         if isinstance(value, str):
             try:
-                value = datetime.strptime(value, '%Y-%m-%d').date()
+                value = date.fromisoformat(value)
             except ValueError:
                 return value
         return value.strftime('%d/%m/%Y') if value else ''
 
 rankings_lock = Lock()
 
+# Hot read statements are built once at import and reused on every request
+_DAY_ENTRIES_STMT = select(
+    Entry.id, Entry.date, Entry.time, Entry.name, Entry.status
+).where(Entry.date == bindparam('date'))
+
+# Bumped by migration 012's trigger on every write to entries
+_ENTRIES_VERSION_SQL = text("SELECT version FROM data_versions WHERE name = 'entries'")
+
+# Polled endpoints share one cached read of the day's entries. The entries
+# version in the key makes every worker drop it as soon as anyone logs, so
+# the TTL only bounds how long superseded versions linger in memory
+DAY_ENTRIES_CACHE_TTL = 30
+
+@ttl_cache(DAY_ENTRIES_CACHE_TTL)
+def _cached_day_entries(date_iso, entries_version):
+    """Entries logged on date_iso as a tuple of plain dicts.
+
+    entries_version is not used here; it only keys the cache.
+    """
+    return tuple({
+        "id": e.id,
+        "date": e.date,
+        "time": e.time,
+        "name": e.name,
+        "status": e.status
+    } for e in Session().execute(_DAY_ENTRIES_STMT, {"date": date_iso}))
+
+def _fetch_day_entries(date_iso):
+    """Entries logged on date_iso, cached until the entries table changes"""
+    entries_version = Session().execute(_ENTRIES_VERSION_SQL).scalar()
+    return _cached_day_entries(date_iso, entries_version)
+
 # -------------
 # AUTH HELPERS
 # -------------
@@ -203,48 +246,60 @@ def login_required(f):
 # AUDIT LOGGING
 # -------------
 
-def log_audit(action, user, details, old_data=None, new_data=None):
-    """Log an audit entry to the database with old/new data comparison."""
-    db = SessionLocal()
+# Settings fields compared for update_settings audits, in change-record order
+_SETTINGS_AUDIT_FIELDS = (
+    'points', 'late_bonus', 'remote_days', 'core_users', 'enable_streaks',
+    'streak_multiplier', 'enable_tiebreakers', 'tiebreaker_points',
+    'tiebreaker_expiry', 'auto_resolve_tiebreakers', 'tiebreaker_weekly',
+    'tiebreaker_monthly'
+)
+
+def _clean_audit_value(v):
+    """Make a value JSON-safe for an audit record"""
+    if v is None:
+        return "None"
+    if isinstance(v, (datetime, date)):
+        return v.isoformat()
+    if isinstance(v, dict):
+        return {k: _clean_audit_value(item) for k, item in v.items() if not k.startswith('_')}
+    if isinstance(v, (list, tuple)):
+        return [_clean_audit_value(item) for item in v]
+    return str(v)
+
+def _modified_fields(old_data, new_data, fields, missing):
+    """Build "modified" change records for the fields whose values differ"""
+    # Keys on both sides compare directly; a key on one side only has changed
+    # unless its value is the placeholder used for a missing field
+    changed = {k for k in old_data.keys() & new_data.keys() if old_data[k] != new_data[k]}
+    changed.update(k for k in old_data.keys() - new_data.keys() if old_data[k] != missing)
+    changed.update(k for k in new_data.keys() - old_data.keys() if new_data[k] != missing)
+    return [{
+        "field": field,
+        "old": old_data.get(field, missing),
+        "new": new_data.get(field, missing),
+        "type": "modified"
+    } for field in fields if field in changed]
+
+def log_audit(action, user, details, old_data=None, new_data=None, db=None):
+    """Record an audit entry with old/new data comparison.
+
+    With db, the row is written in that session's transaction and commits or
+    rolls back with the change it describes. Without it, the row is queued for
+    the background writer (see audit.py for what that gives up).
+    """
     try:
-        logging.info(f"Starting audit log for {action} by {user}")
+        logging.info("Starting audit log for %s by %s", action, user)
 
         # Clean values for JSON
-        def clean_value(v):
-            if v is None:
-                return "None"
-            if isinstance(v, (datetime, date)):
-                return v.isoformat()
-            if isinstance(v, dict):
-                return {k: clean_value(v) for k, v in v.items() if not k.startswith('_')}
-            if isinstance(v, (list, tuple)):
-                return [clean_value(x) for x in v]
-            return str(v)
-
         if old_data:
-            old_data = {k: clean_value(v) for k, v in old_data.items() if not k.startswith('_')}
+            old_data = {k: _clean_audit_value(v) for k, v in old_data.items() if not k.startswith('_')}
         if new_data:
-            new_data = {k: clean_value(v) for k, v in new_data.items() if not k.startswith('_')}
+            new_data = {k: _clean_audit_value(v) for k, v in new_data.items() if not k.startswith('_')}
 
         changes = []
         if action == "update_settings" and old_data and new_data:
             # Compare specific fields
-            fields_to_compare = [
-                'points','late_bonus','remote_days','core_users','enable_streaks',
-                'streak_multiplier','enable_tiebreakers','tiebreaker_points',
-                'tiebreaker_expiry','auto_resolve_tiebreakers','tiebreaker_weekly',
-                'tiebreaker_monthly'
-            ]
-            for field in fields_to_compare:
-                old_val = old_data.get(field)
-                new_val = new_data.get(field)
-                if old_val != new_val:
-                    changes.append({
-                        "field": field,
-                        "old": old_val,
-                        "new": new_val,
-                        "type": "modified"
-                    })
+            changes = _modified_fields(old_data, new_data, _SETTINGS_AUDIT_FIELDS, None)
         elif action == "delete_entry" and old_data:
             changes = [{
                 "field": k, "old": v, "new": "None", "type": "deleted"
@@ -255,34 +310,24 @@ def log_audit(action, user, details, old_data=None, new_data=None):
             } for k, v in new_data.items()]
         elif old_data and new_data:
             # Generic modification
-            all_keys = set(old_data.keys()) | set(new_data.keys())
-            for key in all_keys:
-                old_value = old_data.get(key, "None")
-                new_value = new_data.get(key, "None")
-                if old_value != new_value:
-                    changes.append({
-                        "field": key,
-                        "old": old_value,
-                        "new": new_value,
-                        "type": "modified"
-                    })
+            changes = _modified_fields(old_data, new_data, old_data.keys() | new_data.keys(), "None")
 
         # Only create an AuditLog if changes exist or if it's a non-modification action
         if changes or not (old_data and new_data):
-            audit_entry = AuditLog(
-                user=user,
-                action=action,
-                details=details,
-                changes=changes
-            )
-            db.add(audit_entry)
-            db.commit()
+            row = {
+                "timestamp": datetime.now(),
+                "user": user,
+                "action": action,
+                "details": details,
+                "changes": changes
+            }
+            if db is not None:
+                db.execute(insert(AuditLog), row)
+            else:
+                enqueue_audit(row)
     except Exception as e:
-        db.rollback()
         logging.error(f"Error logging audit: {str(e)}")
         raise
-    finally:
-        db.close()
 
 # -------------
 # ROUTES
@@ -360,8 +405,10 @@ def register():
         
         db = SessionLocal()
         try:
-            existing_user = db.query(User).filter_by(username=username).first()
-            if (existing_user):
+            username_taken = db.execute(
+                select(exists().where(User.username == username))
+            ).scalar()
+            if username_taken:
                 return render_template("error.html", 
                                     error="Username already exists",
                                     back_link=url_for('bp.register'))  # Fix: add bp. prefix
@@ -387,82 +434,58 @@ def register():
 
 @bp.route("/check_attendance")
 def check_attendance():
-    db = SessionLocal()
-    try:
-        # Check if current day is a weekday (0-4 = Monday-Friday)
-        if datetime.now().weekday() >= 5:  # Weekend
-            return jsonify([])
-            
-        today = datetime.now().date().isoformat()
-        today_entries = db.query(Entry).filter_by(date=today).all()
-        present_users = [entry.name for entry in today_entries]
-        missing_users = [user for user in get_core_users() if user not in present_users]
-        return jsonify(missing_users)
-    finally:
-        db.close()
+    # Check if current day is a weekday (0-4 = Monday-Friday)
+    now = datetime.now()
+    if now.weekday() >= 5:  # Weekend
+        return jsonify([])
+        
+    today = now.date().isoformat()
+    present_users = {e["name"] for e in _fetch_day_entries(today)}
+    missing_users = [user for user in get_core_users() if user not in present_users]
+    return jsonify(missing_users)
 
 @bp.route("/today-entries")
 @login_required
 def get_today_entries():
-    db = SessionLocal()
-    try:
-        today = datetime.now().date().isoformat()
-        entries = db.query(Entry).filter_by(date=today).all()
-        return jsonify([{
-            "id": e.id,
-            "date": e.date,
-            "time": e.time,
-            "name": e.name,
-            "status": e.status
-        } for e in entries])
-    finally:
-        db.close()
+    today = datetime.now().date().isoformat()
+    return json_response(_fetch_day_entries(today))
 
 @bp.route("/log", methods=["POST"])
 @login_required
 def log_attendance():
     db = SessionLocal()
     try:
-        # Check for existing entry
-        existing = db.query(Entry).filter_by(
-            date=request.json["date"],
-            name=request.json["name"]
+        entry = {
+            "date": request.json["date"],
+            "name": request.json["name"],
+            "status": request.json["status"],
+            "time": request.json["time"]
+        }
+
+        # The unique (date, name) index rejects duplicates in the same round-trip
+        inserted = db.execute(
+            pg_insert(Entry)
+            .values(id=str(uuid.uuid4()), **entry)
+            .on_conflict_do_nothing(index_elements=['date', 'name'])
+            .returning(Entry.id)
         ).first()
-        
-        if existing:
+
+        if inserted is None:
             return jsonify({
                 "message": "Error: Already logged attendance for this person today.",
                 "type": "error"
             }), 400
-        
-        entry = Entry(
-            id=str(uuid.uuid4()),
-            date=request.json["date"],
-            name=request.json["name"],
-            status=request.json["status"],
-            time=request.json["time"]
-        )
-        
-        db.add(entry)
-        db.commit()
-        
+
         log_audit(
             "log_attendance",
             session['user'],
-            f"Logged attendance for {entry.name}",
-            new_data={
-                "date": entry.date,
-                "name": entry.name,
-                "status": entry.status,
-                "time": entry.time
-            }
+            f"Logged attendance for {entry['name']}",
+            new_data=entry,
+            db=db
         )
+        db.commit()
         
-        if entry.status in ['in-office', 'remote']:
-            settings = db.query(Settings).first()
-            if settings and settings.enable_streaks:
-                # Streak updates are now handled by monitoring container
-                pass
+        # Streak updates are handled by the monitoring container
         
         return jsonify({
             "message": "Attendance logged successfully.",
@@ -485,7 +508,6 @@ def log_attendance():
 # Add cache invalidation on settings update
 def save_settings(settings_data):
     """Update settings with cache invalidation"""
-    load_settings.cache_clear()  # Clear the cached settings
     db = SessionLocal()
     try:
         settings = db.query(Settings).first()
@@ -519,6 +541,8 @@ def save_settings(settings_data):
             settings.auto_resolve_tiebreakers = settings_data.get("auto_resolve_tiebreakers", False)
             settings.tiebreaker_weekly = settings_data.get("tiebreaker_weekly", True)  # Add this
             settings.tiebreaker_monthly = settings_data.get("tiebreaker_monthly", True)  # Add this
+            # Bump the version explicitly: in-place JSON edits don't trigger onupdate
+            settings.updated_at = datetime.now()
             
         else:
             settings = Settings(**settings_data)
@@ -533,8 +557,6 @@ def manage_settings():
     db = SessionLocal()
     try:
         if request.method == "GET":
-            # Clear any stale cache before loading
-            load_settings.cache_clear()
             settings_data = load_settings()
             
             # Ensure working_days exists in points
@@ -550,7 +572,7 @@ def manage_settings():
                     settings_data['points']['working_days'][user] = ['mon', 'tue', 'wed', 'thu', 'fri']
 
             # Get list of registered users for core users selection
-            registered_users = [user[0] for user in db.query(User.username).all()]
+            registered_users = db.execute(select(User.username)).scalars().all()
 
             # Get today's date for template
             today = datetime.now().date()
@@ -568,9 +590,6 @@ def manage_settings():
 
         else:  # POST
             try:
-                # Clear the settings cache immediately
-                load_settings.cache_clear()
-                
                 # Get current settings for comparison
                 old_settings = db.query(Settings).first()
                 old_settings_dict = {
@@ -590,9 +609,9 @@ def manage_settings():
 
                 # Normalize new settings
                 new_settings = request.json
-                app.logger.debug(f"Received settings: {new_settings}")
+                app.logger.debug("Received settings: %s", new_settings)
                 normalized_settings = normalize_settings(new_settings)
-                app.logger.debug(f"Normalized settings: {normalized_settings}")
+                app.logger.debug("Normalized settings: %s", normalized_settings)
 
                 if old_settings:
                     # Update existing settings, explicitly setting each field
@@ -614,12 +633,14 @@ def manage_settings():
                     session['user'],
                     "Updated settings",
                     old_data=old_settings_dict,
-                    new_data=normalized_settings
+                    new_data=normalized_settings,
+                    db=db
                 )
 
+                # A new updated_at makes every worker reload settings; set it
+                # explicitly since onupdate only fires when a column changed
+                old_settings.updated_at = datetime.now()
                 db.commit()
-                # Clear cache again after commit to ensure fresh data on next load
-                load_settings.cache_clear()
 
                 return jsonify({"message": "Settings updated successfully"})
                 
@@ -653,53 +674,64 @@ def view_audit():
         date_to = request.args.get('to')
         
         # Build query
-        query = db.query(AuditLog)
+        stmt = select(
+            AuditLog.timestamp, AuditLog.user, AuditLog.action,
+            AuditLog.details, AuditLog.changes,
+            func.count().over().label("total")
+        )
         
         # Apply filters with proper SQL syntax
         if action_filter != 'all':
-            query = query.filter(AuditLog.action == action_filter)
+            stmt = stmt.where(AuditLog.action == action_filter)
         if user_filter != 'all':
-            query = query.filter(AuditLog.user == user_filter)
+            stmt = stmt.where(AuditLog.user == user_filter)
         if date_from:
             date_from_dt = datetime.strptime(date_from, '%Y-%m-%d')
-            query = query.filter(AuditLog.timestamp >= date_from_dt)
+            stmt = stmt.where(AuditLog.timestamp >= date_from_dt)
         if date_to:
             date_to_dt = datetime.strptime(date_to, '%Y-%m-%d')
-            query = query.filter(AuditLog.timestamp <= date_to_dt)
+            stmt = stmt.where(AuditLog.timestamp <= date_to_dt)
             
-        # Ensure proper ordering
-        query = query.order_by(AuditLog.timestamp.desc())
-
-        # Get total count first
-        total_entries = query.count()
+        # Ensure proper ordering; the window count comes back with the page
+        rows = db.execute(
+            stmt.order_by(AuditLog.timestamp.desc())
+                .offset((page - 1) * per_page)
+                .limit(per_page)
+        ).mappings().all()
+        if rows:
+            total_entries = rows[0]["total"]
+        elif page > 1:
+            # Past the last page there are no rows to carry the total
+            total_entries = db.execute(
+                select(func.count()).select_from(stmt.with_only_columns(AuditLog.id).subquery())
+            ).scalar()
+        else:
+            total_entries = 0
         total_pages = (total_entries + per_page - 1) // per_page
-
-        # Then get paginated results
-        audit_entries = query.offset((page - 1) * per_page)\
-                           .limit(per_page)\
-                           .all()
         
         # Get unique users and actions for filters
-        unique_users = db.query(AuditLog.user).distinct().all()
-        unique_actions = db.query(AuditLog.action).distinct().all()
-        
-        entries = []
-        for entry in audit_entries:
-            audit_data = {
-                "timestamp": entry.timestamp.isoformat(),
-                "user": entry.user,
-                "action": entry.action,
-                "details": entry.details,
-                "changes": entry.changes if entry.changes else []
-            }
-            entries.append(audit_data)
+        # A handful of values each; a plain query sorted by the database
+        unique_users = db.execute(
+            select(AuditLog.user).distinct().order_by(AuditLog.user)
+        ).scalars().all()
+        unique_actions = db.execute(
+            select(AuditLog.action).distinct().order_by(AuditLog.action)
+        ).scalars().all()
+        
+        entries = [{
+            "timestamp": row["timestamp"].isoformat(),
+            "user": row["user"],
+            "action": row["action"],
+            "details": row["details"],
+            "changes": row["changes"] or []
+        } for row in rows]
             
         return render_template("audit.html",
                              entries=entries,
                              current_page=page,
                              total_pages=total_pages,
-                             users=sorted([u[0] for u in unique_users]),
-                             actions=sorted([a[0] for a in unique_actions]),
+                             users=unique_users,
+                             actions=unique_actions,
                              selected_action=action_filter,
                              selected_user=user_filter,
                              date_from=date_from,
@@ -716,28 +748,27 @@ def view_audit():
 
 def calculate_period_averages(rankings, period):
     """Calculate average arrival times for weekly/monthly views"""
+    # Calculate average shift length from points settings
+    settings = get_request_settings()
+    shift_length = float(settings.get('points', {}).get('shift_length', 9))
+
     for rank in rankings:
         arrival_times = rank.get('stats', {}).get('arrival_times', [])
         if arrival_times:
-            avg_time = calculate_average_time(arrival_times)
+            # calculate_scores has already averaged the arrival times
+            avg_time = rank.get('average_arrival_time', "N/A")
             if avg_time != "N/A":
-                avg_datetime = datetime.strptime(avg_time, '%H:%M')
-                
-                # Calculate average shift length from points settings
-                settings = load_settings()
-                shift_length = float(settings.get('points', {}).get('shift_length', 9))
-                
-                # Calculate end time
-                end_datetime = avg_datetime + timedelta(hours=shift_length)
+                avg_minutes = parse_hhmm(avg_time)
                 
                 rank['time'] = avg_time
-                rank['time_obj'] = avg_datetime.time()
-                rank['end_time'] = end_datetime.strftime('%H:%M')
+                rank['time_obj'] = dt_time(avg_minutes // 60, avg_minutes % 60)
+                # Calculate end time
+                rank['end_time'] = minutes_to_hhmm(avg_minutes + int(shift_length * 60))
                 rank['shift_length'] = shift_length * 60  # Convert hours to minutes
         else:
             # Set default values if no arrival times
             rank['time'] = "N/A"
-            rank['time_obj'] = datetime.strptime("00:00", '%H:%M').time()
+            rank['time_obj'] = dt_time(0, 0)
             rank['end_time'] = "N/A"
             rank['shift_length'] = 540  # Default 9 hours in minutes
 
@@ -747,7 +778,8 @@ def calculate_period_averages(rankings, period):
 @track_response_time('rankings')
 def view_rankings(period, date_str=None):
     RANKING_CALLS.inc()
-    db = SessionLocal()
+    # Read-only page: the request-scoped session is released at teardown
+    db = Session()
     try:
         # Change default mode to 'last_in'
         mode = request.args.get('mode', 'last_in')
@@ -755,7 +787,7 @@ def view_rankings(period, date_str=None):
             app.logger.warning(f"Invalid mode provided: {mode}, defaulting to last-in")
             mode = 'last_in'
             
-        app.logger.debug(f"Rankings request - Period: {period}, Date: {date_str}, Mode: {mode}")
+        app.logger.debug("Rankings request - Period: %s, Date: %s, Mode: %s", period, date_str, mode)
         
         # Get current date (either from URL or today)
         try:
@@ -774,18 +806,13 @@ def view_rankings(period, date_str=None):
             if period == 'week':
                 current_date = current_date - timedelta(days=current_date.weekday())
             
-            # Calculate period end date
-            if period == 'week':
-                period_end = current_date + timedelta(days=6)
-            elif period == 'month':
-                next_month = current_date.replace(day=28) + timedelta(days=4)
-                period_end = next_month - timedelta(days=next_month.day)
-            else:
-                period_end = current_date
+            # Calculate period end date from the same bounds used to load entries
+            bounds = period_bounds(period, current_date)
+            period_end = date.fromisoformat(bounds[1]) if bounds else current_date
             
             with rankings_lock:
-                # Ensure thread-safe access to data
-                data = load_data()
+                # Ensure thread-safe access to data; only the period's entries are loaded
+                data = load_data(*(bounds or ()))
                 settings = get_settings()  # Get settings here to pass to calculate_scores
                 
                 if not data:
@@ -805,51 +832,47 @@ def view_rankings(period, date_str=None):
                 if period in ['week', 'month']:
                     calculate_period_averages(rankings, period)
                 
-                # Calculate earliest and latest hours from actual data
-                all_times = []
+                # Get points mode from request
+                points_mode = request.args.get('points_mode', 'average')  # default to average
+                use_total_score = period in ['week', 'month'] and points_mode == 'cumulative'
+
+                # Add current streak for each ranked user; calculate_scores has
+                # already filled in streak, streak_start and is_current_streak
+                current_streaks = calculate_current_streaks(
+                    (rank["name"] for rank in rankings), db)
+
+                # One pass sets scores and streaks and tracks the timeline bounds
+                earliest_minutes = latest_minutes = None
                 for rank in rankings:
+                    if use_total_score:
+                        # Use the total score instead of calculating from average
+                        rank['score'] = round(rank['total_score'], 2)
+                    rank["current_streak"] = current_streaks[rank["name"]]
+
                     if rank.get('time') and rank['time'] != "N/A":
-                        time_obj = datetime.strptime(rank['time'], '%H:%M')
-                        all_times.append(time_obj)
+                        minutes = parse_hhmm(rank['time'])
                         if rank.get('end_time') and rank['end_time'] != "N/A":
-                            end_obj = datetime.strptime(rank['end_time'], '%H:%M')
-                            all_times.append(end_obj)
-                
+                            end_minutes = parse_hhmm(rank['end_time'])
+                            low, high = min(minutes, end_minutes), max(minutes, end_minutes)
+                        else:
+                            low = high = minutes
+                        if earliest_minutes is None:
+                            earliest_minutes, latest_minutes = low, high
+                        else:
+                            earliest_minutes = min(earliest_minutes, low)
+                            latest_minutes = max(latest_minutes, high)
+
                 earliest_hour = 7  # Default earliest
                 latest_hour = 19  # Default latest
                 
-                if all_times:
-                    earliest_time = min(all_times)
-                    latest_time = max(all_times)
-                    earliest_hour = max(7, earliest_time.hour)  # Don't go earlier than 7am
-                    latest_hour = min(19, latest_time.hour + 1)  # Don't go later than 7pm
-
-                # Get points mode from request
-                points_mode = request.args.get('points_mode', 'average')  # default to average
-                
-                for rank in rankings:
-                    if period in ['week', 'month'] and points_mode == 'cumulative':
-                        # Use the total score instead of calculating from average
-                        rank['score'] = round(rank['total_score'], 2)
+                if earliest_minutes is not None:
+                    earliest_hour = max(7, earliest_minutes // 60)  # Don't go earlier than 7am
+                    latest_hour = min(19, latest_minutes // 60 + 1)  # Don't go later than 7pm
 
                 # Sort rankings again if using cumulative mode
                 if points_mode == 'cumulative':
                     rankings.sort(key=lambda x: (-x['score'], x['name']))
 
-                # Add current streak for each ranked user
-                for rank in rankings:
-                    streak = calculate_current_streak(rank["name"])
-                    rank["current_streak"] = streak  # Add this line
-
-                # Add this before returning template
-                for rank in rankings:
-                    streak_info = get_current_streak_info(rank['name'], db)
-                    rank.update({
-                        'streak': streak_info['length'],
-                        'streak_start': streak_info['start'],
-                        'is_current_streak': streak_info['is_current']
-                    })
-
                 template_data = {
                     'rankings': rankings,
                     'period': period,
@@ -877,30 +900,36 @@ def view_rankings(period, date_str=None):
                             error=f"Failed to load rankings",
                             details=str(e),
                             back_link=url_for('bp.index'))
-    finally:
-        db.close()
 
 @bp.route("/rankings/today")
 @login_required
 def daily_rankings():
-    data = load_data()
-    settings = load_settings()
-    today = datetime.now().date().isoformat()
+    settings = get_request_settings()
+    now = datetime.now()
+    today = now.date().isoformat()
+    
+    today_entries = load_data(start_date=today, end_date=today)
+    today_entries.sort(key=itemgetter("time"))
     
-    today_entries = [e for e in data if e["date"] == today]
-    today_entries.sort(key=lambda x: datetime.strptime(x["time"], "%H:%M"))
+    # Fix: Use the correct score based on mode
+    score_key = "last_in" if request.args.get('mode', 'last-in') == 'last-in' else "early_bird"
     
     rankings = []
     total_entries = len(today_entries)
+    db = Session()
+    tiebreaker_wins = (get_tiebreaker_wins(db, today_entries)
+                       if settings.get("enable_tiebreakers", False) else None)
+    streaks_by_user = calculate_current_streaks(
+        (entry["name"] for entry in today_entries), db)
     for position, entry in enumerate(today_entries, 1):
-        scores = calculate_daily_score(entry, settings, position, total_entries)
-        # Fix: Use the correct score based on mode
-        mode = request.args.get('mode', 'last-in')
-        points = scores["last_in"] if mode == 'last-in' else scores["early_bird"]
-        
+        scores = calculate_daily_score(entry, settings, position, total_entries, now=now,
+                                       db=db, tiebreaker_wins=tiebreaker_wins,
+                                       streaks_by_user=streaks_by_user)
+        points = scores[score_key]
+
         # Calculate streak for each user
-        streak = calculate_current_streak(entry["name"])
-        
+        streak = streaks_by_user[entry["name"]]
+
         rankings.append({
             "name": entry["name"],
             "time": entry["time"],
@@ -910,8 +939,8 @@ def daily_rankings():
         })
     
     # Sort by points descending
-    rankings.sort(key=lambda x: x["points"], reverse=True)
-    return jsonify(rankings)
+    rankings.sort(key=itemgetter("points"), reverse=True)
+    return json_response(rankings)
 
 # -------------
 # TIE-BREAKERS
@@ -1094,41 +1123,65 @@ def chatbot():
 # MAINTENANCE
 # -------------
 
+# Built once at import rather than wrapped in text() on every page view
+_MONITORING_LOGS_PAGE_SQL = text("""
+    SELECT 
+        id,
+        timestamp,
+        event_type,
+        details,
+        status
+    FROM monitoring_logs
+    WHERE CAST(:before_ts AS timestamp) IS NULL
+       OR (timestamp, id) < (CAST(:before_ts AS timestamp), CAST(:before_id AS integer))
+    ORDER BY timestamp DESC, id DESC
+    LIMIT :limit
+""")
+_MONITORING_LOGS_ESTIMATE_SQL = text("""
+    SELECT reltuples::bigint FROM pg_class WHERE relname = 'monitoring_logs'
+""")
+
 @bp.route("/maintenance")
 @login_required
 def maintenance():
     db = SessionLocal()
     try:
-        # Get pagination parameters
-        page = request.args.get('page', 1, type=int)
+        # Keyset pagination: each page starts below the last (timestamp, id) shown;
+        # id breaks ties so rows sharing the boundary timestamp aren't skipped
+        before_ts = before_id = None
+        before = request.args.get('before')
+        if before:
+            try:
+                before_ts, before_id = before.rsplit('|', 1)
+                # Parsed here so a bad value never reaches SQL as a cast error
+                before_ts = datetime.fromisoformat(before_ts)
+                before_id = int(before_id)
+            except ValueError:
+                # A malformed cursor just shows the newest page
+                before_ts = before_id = None
         per_page = request.args.get('per_page', 50, type=int)
         # Ensure per_page is within limits
         per_page = min(max(per_page, 50), 500)
 
-        # Calculate offset
-        offset = (page - 1) * per_page
-        
-        # Fetch monitoring logs with pagination
+        # Fetch one extra row to learn whether an older page exists
         monitoring_logs = db.execute(
-            text("""
-                SELECT 
-                    timestamp,
-                    event_type,
-                    details,
-                    status
-                FROM monitoring_logs
-                ORDER BY timestamp DESC
-                LIMIT :limit OFFSET :offset
-            """),
+            _MONITORING_LOGS_PAGE_SQL,
             {
-                "limit": per_page,
-                "offset": offset
+                "before_ts": before_ts,
+                "before_id": before_id,
+                "limit": per_page + 1
             }
         ).fetchall()
 
-        # Get total count for pagination
-        total_logs = db.scalar(text("SELECT COUNT(*) FROM monitoring_logs"))
-        total_pages = (total_logs + per_page - 1) // per_page
+        has_more = len(monitoring_logs) > per_page
+        monitoring_logs = monitoring_logs[:per_page]
+        next_cursor = None
+        if has_more:
+            last = monitoring_logs[-1]
+            next_cursor = f"{last.timestamp.isoformat()}|{last.id}"
+
+        # Planner statistics give a close enough total without a full scan
+        total_logs = max(db.scalar(_MONITORING_LOGS_ESTIMATE_SQL) or 0, 0)
         
         # Get core users for test data selection
         settings = db.query(Settings).first()
@@ -1137,8 +1190,8 @@ def maintenance():
         return render_template(
             "maintenance.html",
             monitoring_logs=monitoring_logs,
-            current_page=page,
-            total_pages=total_pages,
+            next_cursor=next_cursor,
+            total_logs=total_logs,
             per_page=per_page,
             core_users=core_users  # Pass core users to template
         )
@@ -1154,7 +1207,8 @@ def reset_tiebreakers():
         log_audit(
             "reset_tiebreakers",
             session['user'],
-            "Manual reset of tie breakers"
+            "Manual reset of tie breakers",
+            db=db
         )
         
         # Delete all tie breakers (cascades to games and participants)
@@ -1183,7 +1237,8 @@ def reset_streaks():
         log_audit(
             "reset_streaks",
             session['user'],
-            "Manual reset of streaks"
+            "Manual reset of streaks",
+            db=db
         )
         
         # Drop and recreate user_streaks table
@@ -1223,7 +1278,8 @@ def reset_tiebreaker_effects():
         log_audit(
             "reset_tiebreaker_effects",
             session['user'],
-            "Manual reset of tie breaker effects"
+            "Manual reset of tie breaker effects",
+            db=db
         )
         
         # Update all completed tie breakers
@@ -1307,16 +1363,13 @@ def seed_test_data():
         app.logger.info(f"Creating weekly tie breaker ending {week_end}")
         
         # Create test entries for the period to ensure valid tie breaker
-        for user in test_users:
-            # Add a test entry for each user
-            entry = Entry(
-                id=str(uuid.uuid4()),
-                date=last_week.strftime('%Y-%m-%d'),
-                time='09:00',
-                name=user,
-                status='in-office'
-            )
-            db.add(entry)
+        save_entries([{
+            "id": str(uuid.uuid4()),
+            "date": last_week.strftime('%Y-%m-%d'),
+            "time": '09:00',
+            "name": user,
+            "status": 'in-office'
+        } for user in test_users], db)
         
         tie_id = create_test_tie_breaker(db, 'weekly', week_end, 10.0, 'last-in', test_users)
         if tie_id:
@@ -1361,14 +1414,13 @@ def seed_test_data():
 def health_check():
     try:
         db = SessionLocal()
-        db.execute("SELECT 1")
+        db.execute(text("SELECT 1"))
         settings = load_settings()
         metrics = {
             "database": "healthy",
             "settings": "loaded" if settings else "missing",
             "cache_stats": {
-                "settings": load_settings.cache_info(),
-                "scores": calculate_daily_score.cache_info()
+                "settings": settings_for_version.cache_info()
             }
         }
         return jsonify({"status": "healthy", "metrics": metrics})
@@ -1377,42 +1429,64 @@ def health_check():
     finally:
         db.close()
 
+# Postgres renders each exported row as JSON text, so rows stream straight
+# through without being rebuilt as Python dicts and re-encoded
+_EXPORT_ENTRIES_STMT = text("""
+    SELECT json_build_object(
+        'id', id, 'date', date, 'time', time, 'name', name,
+        'status', status, 'timestamp', timestamp
+    )::text
+    FROM entries
+""").execution_options(stream_results=True)
+_EXPORT_SETTINGS_STMT = select(Settings.points, Settings.late_bonus, Settings.remote_days).limit(1)
+_EXPORT_AUDIT_STMT = text("""
+    SELECT json_build_object(
+        'timestamp', timestamp, 'user', "user", 'action', action,
+        'details', details, 'changes', changes
+    )::text
+    FROM audit_log
+""").execution_options(stream_results=True)
+
+IMPORT_BATCH_SIZE = 1000
+# No foreign keys point at these tables, so TRUNCATE needs no CASCADE
+_CLEAR_DATA_SQL = text("TRUNCATE entries, settings, audit_log RESTART IDENTITY")
+# Imports at least this large load entries through COPY rather than INSERT batches
+IMPORT_COPY_THRESHOLD = 5000
+
+def _stream_json_array(rows, batch_size=1000):
+    """Yield pre-encoded JSON rows as comma-joined byte batches of an array"""
+    batch = []
+    first = True
+    for (element,) in rows:
+        batch.append(element)
+        if len(batch) >= batch_size:
+            yield (("" if first else ",") + ",".join(batch)).encode()
+            first = False
+            batch = []
+    if batch:
+        yield (("" if first else ",") + ",".join(batch)).encode()
+
 @bp.route("/export-data")
 @login_required
 def export_data():
-    db = SessionLocal()
-    try:
-        # Export all tables
-        entries = db.query(Entry).all()
-        settings = db.query(Settings).first()
-        audit_logs = db.query(AuditLog).all()
-
-        data = {
-            "entries": [{
-                "id": e.id,
-                "date": e.date,
-                "time": e.time,
-                "name": e.name,
-                "status": e.status,
-                "timestamp": e.timestamp.isoformat()
-            } for e in entries],
-            "settings": {
+    def generate():
+        # Rows come off a server-side cursor and are written out as they arrive
+        with engine.connect() as conn:
+            yield b'{"entries":['
+            yield from _stream_json_array(conn.execute(_EXPORT_ENTRIES_STMT))
+
+            settings = conn.execute(_EXPORT_SETTINGS_STMT).first()
+            yield b'],"settings":' + json_dumps({
                 "points": settings.points,
                 "late_bonus": settings.late_bonus,
                 "remote_days": settings.remote_days
-            } if settings else None,
-            "audit_logs": [{
-                "timestamp": log.timestamp.isoformat(),
-                "user": log.user,
-                "action": log.action,
-                "details": log.details,
-                "changes": log.changes
-            } for log in audit_logs]
-        }
-        
-        return jsonify(data)
-    finally:
-        db.close()
+            } if settings else None)
+
+            yield b',"audit_logs":['
+            yield from _stream_json_array(conn.execute(_EXPORT_AUDIT_STMT))
+            yield b']}'
+
+    return app.response_class(stream_with_context(generate()), mimetype='application/json')
 
 @bp.route("/import-data", methods=["POST"])
 @login_required
@@ -1423,22 +1497,16 @@ def import_data():
     data = request.json
     db = SessionLocal()
     try:
-        # Clear existing data
-        db.query(Entry).delete()
-        db.query(Settings).delete()
-        db.query(AuditLog).delete()
-
-        # Import entries
-        for entry_data in data.get("entries", []):
-            entry = Entry(
-                id=entry_data["id"],
-                date=entry_data["date"],
-                time=entry_data["time"],
-                name=entry_data["name"],
-                status=entry_data["status"],
-                timestamp=datetime.fromisoformat(entry_data["timestamp"])
-            )
-            db.add(entry)
+        # Clear existing data in one statement instead of row-by-row deletes
+        db.execute(_CLEAR_DATA_SQL)
+
+        entries = data.get("entries", [])
+        if len(entries) >= IMPORT_COPY_THRESHOLD:
+            copy_entries(entries, db)
+        else:
+            # Import entries as multi-row inserts rather than one ORM object each
+            save_entries(import_entry_rows(entries), db, IMPORT_BATCH_SIZE,
+                         skip_duplicates=True)
 
         # Import settings
         if data.get("settings"):
@@ -1450,19 +1518,33 @@ def import_data():
             db.add(settings)
 
         # Import audit logs
-        for log_data in data.get("audit_logs", []):
-            log = AuditLog(
-                timestamp=datetime.fromisoformat(log_data["timestamp"]),
-                user=log_data["user"],
-                action=log_data["action"],
-                details=log_data["details"],
-                changes=log_data["changes"]
-            )
-            db.add(log)
+        log_rows = ({
+            "timestamp": log_data["timestamp"],
+            "user": log_data["user"],
+            "action": log_data["action"],
+            "details": log_data["details"],
+            "changes": log_data["changes"]
+        } for log_data in data.get("audit_logs", []))
+        for batch in batched(log_rows, IMPORT_BATCH_SIZE):
+            db.execute(insert(AuditLog), batch)
 
         db.commit()
+
+        # Rebuild streaks for the imported entries in one upsert; the import
+        # itself has already been committed if this fails
+        try:
+            bulk_update_streaks(db)
+            db.commit()
+        except Exception as e:
+            db.rollback()
+            app.logger.error(f"Error refreshing streaks after import: {str(e)}")
+
         return jsonify({"message": "Data imported successfully"})
     
+    except ValueError as e:
+        # An incomplete entry rejects the whole import, whichever path loads it
+        db.rollback()
+        return jsonify({"error": str(e)}), 400
     except Exception as e:
         db.rollback()
         return jsonify({"error": str(e)}), 500
@@ -1475,9 +1557,7 @@ def clear_database():
     db = SessionLocal()
     try:
         # Clear all tables
-        db.query(Entry).delete()
-        db.query(Settings).delete()
-        db.query(AuditLog).delete()
+        db.execute(_CLEAR_DATA_SQL)
         db.commit()
 
         log_audit(
@@ -1724,7 +1804,8 @@ def join_game(game_id):
             "join_game",
             current_user,
             f"Joined game {game_id}",
-            new_data={"game_id": game_id, "game_type": game.game_type}
+            new_data={"game_id": game_id, "game_type": game.game_type},
+            db=db
         )
 
         db.commit()
@@ -1765,66 +1846,88 @@ def handle_rules():
     finally:
         db.close()
 
+def _encode_history_cursor(row):
+    """Keyset cursor for /api/history pointing just past the given row"""
+    return f"{row['date']}|{row['time']}|{row['id']}"
+
+def _decode_history_cursor(cursor):
+    """Split a history cursor back into its (date, time, id) sort key"""
+    last_date, last_time, last_id = cursor.split('|', 2)
+    return last_date, last_time, last_id
+
 @bp.route("/api/history")
 @login_required
 def get_history():
     db = SessionLocal()
     try:
         # Get query parameters with defaults
-        page = request.args.get('page', 1, type=int)
         per_page = min(int(request.args.get('per_page', 50)), 500)
+        cursor = request.args.get('cursor')
+        include_total = request.args.get('include_total') == '1'
         users = request.args.getlist('users[]')
         statuses = request.args.getlist('status[]')
         from_date = request.args.get('fromDate')
         to_date = request.args.get('toDate')
 
-        # Build base query
-        query = db.query(Entry)
+        # Build base query over just the columns the response needs
+        stmt = select(Entry.id, Entry.date, Entry.time, Entry.name, Entry.status)
 
         # Apply filters
         if users and 'all' not in users:
-            query = query.filter(Entry.name.in_(users))
+            stmt = stmt.where(Entry.name.in_(users))
         if statuses and 'all' not in statuses:
-            query = query.filter(Entry.status.in_(statuses))
+            stmt = stmt.where(Entry.status.in_(statuses))
         if from_date:
-            query = query.filter(Entry.date >= from_date)
+            stmt = stmt.where(Entry.date >= from_date)
         if to_date:
-            query = query.filter(Entry.date <= to_date)
-
-        # Get total count
-        total_count = query.count()
-
-        # Get paginated results
-        entries = query.order_by(Entry.date.desc(), Entry.time.desc())\
-                      .offset((page - 1) * per_page)\
-                      .limit(per_page)\
-                      .all()
-
-        # Format results
-        results = []
-        for entry in entries:
-            # Calculate position for the day
-            day_position = db.query(Entry)\
-                .filter(Entry.date == entry.date)\
-                .filter(Entry.time <= entry.time)\
-                .count()
+            stmt = stmt.where(Entry.date <= to_date)
+
+        # The count scans every matching row, so it only runs when the client asks
+        total_count = None
+        if include_total:
+            total_count = db.execute(
+                select(func.count()).select_from(stmt.subquery())
+            ).scalar()
+        if cursor:
+            last_date, last_time, last_id = _decode_history_cursor(cursor)
+            stmt = stmt.where(
+                tuple_(Entry.date, Entry.time, Entry.id) < tuple_(last_date, last_time, last_id)
+            )
 
-            results.append({
-                'id': entry.id,
-                'date': entry.date,
-                'time': entry.time,
-                'name': entry.name,
-                'status': entry.status,
-                'position': day_position
-            })
+        # Keyset pagination: seek past the cursor instead of OFFSET scanning
+        stmt = stmt.order_by(Entry.date.desc(), Entry.time.desc(), Entry.id.desc())\
+                   .limit(per_page + 1)
+        results = [dict(row) for row in db.execute(stmt).mappings()]
+        has_more = len(results) > per_page
+        results = results[:per_page]
+        next_cursor = None
+        if has_more:
+            next_cursor = _encode_history_cursor(results[-1])
+
+        # Day positions for the whole page from one query over its dates
+        day_times = defaultdict(list)
+        if results:
+            day_rows = db.execute(
+                select(Entry.date, Entry.time)
+                .where(Entry.date.in_({row['date'] for row in results}))
+            )
+            for day, entry_time in day_rows:
+                day_times[day].append(entry_time)
+            for times in day_times.values():
+                times.sort()
+        for row in results:
+            row['position'] = bisect_right(day_times[row['date']], row['time'])
 
-        return jsonify({
+        response = {
             'entries': results,
-            'total': total_count,
-            'page': page,
             'per_page': per_page,
-            'total_pages': (total_count + per_page - 1) // per_page
-        })
+            'next_cursor': next_cursor,
+            'has_more': has_more
+        }
+        if total_count is not None:
+            response['total'] = total_count
+            response['total_pages'] = (total_count + per_page - 1) // per_page
+        return json_response(response)
 
     except Exception as e:
         app.logger.error(f"Error fetching history: {str(e)}")
@@ -1836,86 +1939,80 @@ def get_history():
 @bp.route("/rankings/day/<date>")
 @login_required
 def day_rankings(date=None):
-    db = SessionLocal()
-
+    now = datetime.now()
     if date is None:
-        date = datetime.now().date().isoformat()
+        date = now.date().isoformat()
     
-    data = load_data()
-    settings = load_settings()
+    settings = get_request_settings()
     mode = request.args.get('mode', 'last_in')
     
-    today_entries = [e for e in data if e["date"] == date]
-    today_entries.sort(key=lambda x: datetime.strptime(x["time"], "%H:%M"))
+    today_entries = load_data(start_date=date, end_date=date)
+    today_entries.sort(key=itemgetter("time"))
+    
+    # Every entry shares the same date, so the shift for that day is resolved once
+    weekday = datetime.fromisoformat(date).strftime('%A').lower()
+    day_shift = settings["points"].get("daily_shifts", {}).get(weekday, {
+        "hours": settings["points"].get("shift_length", 9),
+        "start": "09:00"
+    })
+    shift_length_hours = float(day_shift["hours"])
+    shift_length = int(shift_length_hours * 60)
     
     rankings = []
     total_entries = len(today_entries)
+    earliest_minutes = latest_minutes = None
+    # The request's session serves the score and streak lookups for every entry
+    db = Session()
+    tiebreaker_wins = (get_tiebreaker_wins(db, today_entries)
+                       if settings.get("enable_tiebreakers", False) else None)
+    # One streak query serves both the scores and the streak columns
+    streak_infos = get_current_streak_infos((entry["name"] for entry in today_entries), db)
+    streaks_by_user = current_streak_lengths(streak_infos)
     for position, entry in enumerate(today_entries, 1):
-        scores = calculate_daily_score(entry, settings, position, total_entries, mode)
-        
-        entry_time = datetime.strptime(entry["time"], "%H:%M")
-        entry_date = datetime.strptime(entry["date"], "%Y-%m-%d")
-        
-        weekday = entry_date.strftime('%A').lower()
-        day_shift = settings["points"].get("daily_shifts", {}).get(weekday, {
-            "hours": settings["points"].get("shift_length", 9),
-            "start": "09:00"
-        })
-        
-        shift_length_hours = float(day_shift["hours"])
-        shift_length = int(shift_length_hours * 60)
-        end_time = entry_time + timedelta(minutes=shift_length)
-        
+        scores = calculate_daily_score(entry, settings, position, total_entries, mode,
+                                       now=now, db=db, tiebreaker_wins=tiebreaker_wins,
+                                       streaks_by_user=streaks_by_user)
+        streak_info = streak_infos[entry["name"]]
+
+        entry_minutes = parse_hhmm(entry["time"])
+        end_minutes = (entry_minutes + shift_length) % 1440
+
+        # Track the timeline bounds while building, instead of a second pass
+        low, high = min(entry_minutes, end_minutes), max(entry_minutes, end_minutes)
+        if earliest_minutes is None:
+            earliest_minutes, latest_minutes = low, high
+        else:
+            earliest_minutes = min(earliest_minutes, low)
+            latest_minutes = max(latest_minutes, high)
+
         rankings.append({
             "name": entry["name"],
             "time": entry["time"],
-            "time_obj": entry_time,
+            "time_obj": dt_time(entry_minutes // 60, entry_minutes % 60),
+            "minutes": entry_minutes,
+            "end_minutes": end_minutes,
             "shift_length": shift_length,
             "shift_hours": shift_length_hours,
-            "end_time": end_time.strftime('%H:%M'),
+            "end_time": minutes_to_hhmm(end_minutes),
             "status": entry["status"],
             "points": scores["last_in"] if mode == 'last_in' else scores["early_bird"],
-            "streak": scores.get("current_streak", 0)  # Use get() with default value
+            "streak": streak_info['length'],
+            "streak_start": streak_info['start'],
+            "is_current_streak": streak_info['is_current']
         })
     
     # Sort by points descending
-    rankings.sort(key=lambda x: x["points"], reverse=True)
-    
-    # Get shift length based on the day
-    weekday = datetime.strptime(date, '%Y-%m-%d').strftime('%A').lower()
-    day_shift = settings["points"].get("daily_shifts", {}).get(weekday, {
-        "hours": settings["points"].get("shift_length", 9),
-        "start": "09:00"
-    })
+    rankings.sort(key=itemgetter("points"), reverse=True)
     
-    shift_start = datetime.strptime(day_shift["start"], "%H:%M")
-    start_hour = shift_start.hour
-    start_minute = shift_start.minute
+    start_hour, start_minute = divmod(parse_hhmm(day_shift["start"]), 60)
     
     # Calculate earliest and latest hours from actual data
-    all_times = []
-    for rank in rankings:
-        if rank.get('time'):
-            time_obj = datetime.strptime(rank['time'], "%H:%M")
-            all_times.append(time_obj)
-            if rank.get('end_time'):
-                end_obj = datetime.strptime(rank['end_time'], "%H:%M")
-                all_times.append(end_obj)
-
     earliest_hour = 7  # Default earliest
     latest_hour = 19  # Default latest
     
-    if all_times:
-        earliest_time = min(all_times)
-        latest_time = max(all_times)
-        earliest_hour = max(7, earliest_time.hour)  # Don't go earlier than 7am
-        latest_hour = min(19, latest_time.hour + 1)  # Don't go later than 7pm
-
-    for entry in rankings:
-        streak_info = get_current_streak_info(entry['name'], db)
-        entry['streak'] = streak_info['length']
-        entry['streak_start'] = streak_info['start']
-        entry['is_current_streak'] = streak_info['is_current']
+    if earliest_minutes is not None:
+        earliest_hour = max(7, earliest_minutes // 60)  # Don't go earlier than 7am
+        latest_hour = min(19, latest_minutes // 60 + 1)  # Don't go later than 7pm
 
     return render_template("day_rankings.html", 
                          rankings=rankings,
@@ -1929,70 +2026,51 @@ def day_rankings(date=None):
 @bp.route("/history")
 @login_required
 def history():
-    db = SessionLocal()
-    try:
-        page = request.args.get("page", 1, type=int)
-        per_page = request.args.get("per_page", 50, type=int)
-        per_page = min(max(per_page, 1), 500)
-        query = db.query(Entry).order_by(Entry.timestamp.desc())
-        total_entries = query.count()
-        total_pages = (total_entries + per_page - 1) // per_page
-        offset = (page - 1) * per_page
-        results = query.offset(offset).limit(per_page).all()
-
-        return render_template(
-            "history.html",
-            entries=results,
-            current_page=page,
-            total_pages=total_pages,
-            per_page=per_page
-        )
-    finally:
-        db.close()
+    # The page fetches its rows from /api/history, so nothing is queried here
+    return render_template("history.html")
 
 @bp.route("/streaks")
 @login_required
 def view_streaks():
     """View streaks for all users"""
-    db = SessionLocal()
-    try:
-        recent_users = db.query(Entry.name).distinct().filter(
-            Entry.date >= (datetime.now() - timedelta(days=30)).strftime('%Y-%m-%d')
-        ).all()
-        recent_users = [u[0] for u in recent_users]
-        
-        today = datetime.now().date()
-        streak_data = []
-        
-        for username in recent_users:
-            # Get complete streak history
-            streaks = get_streak_history(username, db)
-            
-            # Get current streak (if any)
-            current_streak = next((s for s in streaks if s['is_current']), None)
-            past_streaks = [s for s in streaks if not s['is_current']]
-            
-            streak_info = {
-                'username': username,
-                'current_streak': current_streak['length'] if current_streak else 0,
-                'current_start': current_streak['start'] if current_streak else None,
-                'is_current': bool(current_streak),
-                'max_streak': max((s['length'] for s in streaks), default=0),
-                'past_streaks': [current_streak] + past_streaks if current_streak else past_streaks
-            }
-            
-            streak_data.append(streak_info)
-        
-        # Sort by current streak first, then max streak
-        streak_data.sort(key=lambda x: (-x['current_streak'], -x['max_streak']))
+    # Read-only page: the request-scoped session is released at teardown
+    db = Session()
+    today = datetime.now().date()
+    recent_users = db.execute(
+        select(Entry.name).distinct().where(
+            Entry.date >= (today - timedelta(days=30)).isoformat()
+        )
+    ).scalars().all()
+    
+    streak_data = []
+    
+    for username in recent_users:
+        # Get complete streak history
+        streaks = get_streak_history(username, db)
+        
+        # Get current streak (if any)
+        current_streak = next((s for s in streaks if s['is_current']), None)
+        past_streaks = [s for s in streaks if not s['is_current']]
+        
+        streak_info = {
+            'username': username,
+            'current_streak': current_streak['length'] if current_streak else 0,
+            'current_start': current_streak['start'] if current_streak else None,
+            'is_current': bool(current_streak),
+            'max_streak': max((s['length'] for s in streaks), default=0),
+            'past_streaks': [current_streak] + past_streaks if current_streak else past_streaks
+        }
         
-        max_streak = max((s['max_streak'] for s in streak_data), default=0)
-        return render_template("streaks.html", 
-                             streaks=streak_data,
-                             max_streak=max_streak,
-                             today=today)
-    finally:
-        db.close()
+        streak_data.append(streak_info)
+    
+    # Sort by current streak first, then max streak
+    streak_data.sort(key=lambda x: (-x['current_streak'], -x['max_streak']))
+    
+    max_streak = max((s['max_streak'] for s in streak_data), default=0)
+    return render_template("streaks.html", 
+                         streaks=streak_data,
+                         max_streak=max_streak,
+                         today=today)
 
 # Remove update_user_streak function since it's handled by monitoring service
 # Remove other streak-related functions that are no longer needed
@@ -2003,102 +2081,126 @@ def visualisations():
     core_users = get_core_users()  # Use the dynamic function instead of CORE_USERS constant
     return render_template("visualisations.html", core_users=core_users)
 
+# Dashboards poll this with the same arguments. Entry writes (via migration 012's
+# trigger) and settings edits change the versions in the key, so every worker
+# sees them at once; the TTL only bounds the relative date range going stale
+VISUALIZATION_CACHE_TTL = 30
+
+_DATA_VERSIONS_SQL = text("""
+    SELECT
+        (SELECT version FROM data_versions WHERE name = 'entries'),
+        (SELECT updated_at FROM settings LIMIT 1)
+""")
+
+@ttl_cache(VISUALIZATION_CACHE_TTL)
+def _visualization_data(mode, date_range, user_param, entries_version, settings_version):
+    """Visualisation payload for one combination of request arguments.
+
+    entries_version and settings_version are not used here; they only key the cache.
+    """
+    user_filter = user_param.split(',')
+    
+    # Let the database apply the range and user filters
+    cutoff_date = None
+    if date_range != 'all':
+        days = int(date_range)
+        cutoff_date = (datetime.now().date() - timedelta(days=days)).isoformat()
+    names = None if 'all' in user_filter else user_filter
+    
+    filtered_data = load_data(start_date=cutoff_date, names=names)
+    if not filtered_data:
+        return {
+            "weeklyPatterns": {},
+            "statusCounts": {"in_office": 0, "remote": 0, "sick": 0, "leave": 0},
+            "pointsProgress": {},
+            "dailyActivity": {},
+            "lateArrivalAnalysis": {},
+            "userComparison": {}
+        }
+    
+    return {
+        # Plain counts are grouped by the database rather than over the loaded rows
+        'statusCounts': query_status_counts(start_date=cutoff_date, names=names),
+        'pointsProgress': calculate_points_progression(filtered_data, mode),
+        'dailyActivity': query_daily_activity(start_date=cutoff_date, names=names),
+        # Weekly patterns, late arrivals and user comparison share one pass
+        **summarize_attendance(filtered_data)
+    }
+
 @bp.route("/visualization-data")
 @login_required
 def get_visualization_data():
     try:
-        # Add mode to visualization data request
-        mode = request.args.get('mode', 'last-in')
-        data = load_data()
-        if not data:
-            return jsonify({
-                "weeklyPatterns": {},
-                "statusCounts": {"in_office": 0, "remote": 0, "sick": 0, "leave": 0},
-                "pointsProgress": {},
-                "dailyActivity": {},
-                "lateArrivalAnalysis": {},
-                "userComparison": {}
-            })
-            
-        date_range = request.args.get('range', 'all')
-        user_filter = request.args.get('user', 'all').split(',')
-        
-        cutoff_date = None
-        if date_range != 'all':
-            days = int(date_range)
-            cutoff_date = datetime.now().date() - timedelta(days=days)
-        
-        filtered_data = []
-        for entry in data:
-            try:
-                entry_date = datetime.strptime(entry['date'], '%Y-%m-%d').date()
-                if cutoff_date and entry_date < cutoff_date:
-                    continue
-                if 'all' not in user_filter and entry['name'] not in user_filter:
-                    continue
-                filtered_data.append(entry)
-            except (ValueError, KeyError):
-                continue
-        
-        vis_data = {
-            'weeklyPatterns': calculate_weekly_patterns(filtered_data),
-            'statusCounts': calculate_status_counts(filtered_data),
-            'pointsProgress': calculate_points_progression(filtered_data),
-            'dailyActivity': calculate_daily_activity(filtered_data),
-            'lateArrivalAnalysis': analyze_late_arrivals(filtered_data),
-            'userComparison': calculate_user_comparison(filtered_data)
-        }
-        
-        return jsonify(vis_data)
+        entries_version, settings_version = Session().execute(_DATA_VERSIONS_SQL).one()
+        vis_data = _visualization_data(
+            request.args.get('mode', 'last-in'),
+            request.args.get('range', 'all'),
+            request.args.get('user', 'all'),
+            entries_version,
+            settings_version
+        )
+        return json_response(vis_data)
     except Exception as e:
         app.logger.error(f"Visualization error: {str(e)}")
         return jsonify({
             "error": f"Failed to generate visualization data: {str(e)}"
         }), 500
     
+_EDITABLE_ENTRY_FIELDS = ("date", "time", "name", "status")
+_ENTRY_BY_ID_STMT = select(
+    Entry.date, Entry.time, Entry.name, Entry.status
+).where(Entry.id == bindparam('id'))
+
 @bp.route("/edit/<entry_id>", methods=["PATCH", "DELETE"])
 @login_required
 def modify_entry(entry_id):
     db = SessionLocal()
     try:
-        entry = db.query(Entry).filter_by(id=entry_id).first()
+        entry = db.execute(_ENTRY_BY_ID_STMT, {"id": entry_id}).first()
         if not entry:
             return jsonify({"error": "Entry not found"}), 404
         
+        # Store old data for audit
+        old_data = {
+            "date": entry.date,
+            "time": entry.time,
+            "name": entry.name,
+            "status": entry.status
+        }
+        
         if request.method == "PATCH":
-            # Store old data for audit
-            old_data = {
-                "date": entry.date,
-                "time": entry.time,
-                "name": entry.name,
-                "status": entry.status
-            }
-            
             updated_data = request.json
+            values = {k: v for k, v in updated_data.items() if k in _EDITABLE_ENTRY_FIELDS}
+            new_date = values.get("date", entry.date)
             
-            # Check for duplicates
-            existing = db.query(Entry).filter(
-                Entry.date == updated_data.get("date", entry.date),
-                Entry.name == updated_data.get("name", entry.name),
-                Entry.id != entry_id
-            ).first()
-            
-            if existing:
-                return jsonify({
-                    "message": "Error: Already have an entry for this person on this date.",
-                    "type": "error"
-                }), 400
-            
-            # Update entry
-            for key, value in updated_data.items():
-                setattr(entry, key, value)
+            if values:
+                # Update only if no other entry exists for this person on this date
+                other = Entry.__table__.alias("other")
+                duplicate = select(other.c.id).where(
+                    other.c.date == new_date,
+                    other.c.name == values.get("name", entry.name),
+                    other.c.id != entry_id
+                ).exists()
+                result = db.execute(
+                    update(Entry)
+                    .where(Entry.id == entry_id, ~duplicate)
+                    .values(**values)
+                    .execution_options(synchronize_session=False)
+                )
+                
+                if result.rowcount == 0:
+                    return jsonify({
+                        "message": "Error: Already have an entry for this person on this date.",
+                        "type": "error"
+                    }), 400
             
             log_audit(
                 "modify_entry",
                 session['user'],
-                f"Modified entry for {entry.name} on {entry.date}",
+                f"Modified entry for {values.get('name', entry.name)} on {new_date}",
                 old_data=old_data,
-                new_data=updated_data
+                new_data=updated_data,
+                db=db
             )
         else:
             # Log deletion
@@ -2106,14 +2208,14 @@ def modify_entry(entry_id):
                 "delete_entry",
                 session['user'],
                 f"Deleted entry for {entry.name} on {entry.date}",
-                old_data={
-                    "date": entry.date,
-                    "time": entry.time,
-                    "name": entry.name,
-                    "status": entry.status
-                }
+                old_data=old_data,
+                db=db
+            )
+            db.execute(
+                delete(Entry)
+                .where(Entry.id == entry_id)
+                .execution_options(synchronize_session=False)
             )
-            db.delete(entry)
         
         db.commit()
         
@@ -2516,49 +2618,44 @@ def api_login():
 def api_rankings(period, date_str=None):
     try:
         mode = request.args.get('mode', 'last_in')
-        data = load_data()
+        current_date = datetime.strptime(date_str, '%Y-%m-%d') if date_str else datetime.now()
+        data = load_data(*(period_bounds(period, current_date) or ()))
         if not data:
             return jsonify([])
             
-        current_date = datetime.strptime(date_str, '%Y-%m-%d') if date_str else datetime.now()
         rankings = calculate_scores(data, period, current_date, mode=mode)
-        return jsonify(rankings)
+        return json_response(rankings)
     except Exception as e:
         return jsonify({"error": str(e)}), 500
 
 @bp.route("/api/streaks")
 @api_auth_required
 def api_streaks():
-    db = SessionLocal()
-    try:
-        streaks = []
-        recent_users = db.query(Entry.name).distinct().all()
-        for (username,) in recent_users:
-            streak_info = get_current_streak_info(username, db)
-            streaks.append({
-                "username": username,
-                "current_streak": streak_info['length'],
-                "max_streak": streak_info.get('max_streak', 0),
-                "streak_start": streak_info['start'].isoformat() if streak_info['start'] else None
-            })
-        return jsonify(streaks)
-    finally:
-        db.close()
+    # Read-only endpoint: the request-scoped session is released at teardown
+    db = Session()
+    streaks = []
+    recent_users = db.execute(select(Entry.name).distinct()).scalars().all()
+    streak_infos = get_current_streak_infos(recent_users, db)
+    for username in recent_users:
+        streak_info = streak_infos[username]
+        streaks.append({
+            "username": username,
+            "current_streak": streak_info['length'],
+            "max_streak": streak_info.get('max_streak', 0),
+            "streak_start": streak_info['start'].isoformat() if streak_info['start'] else None
+        })
+    return json_response(streaks)
 
 @bp.route("/api/users/<username>/stats")
 @api_auth_required
 def api_user_stats(username):
     try:
-        data = load_data()
-        if not data:
-            return jsonify({"error": "No data found"}), 404
-            
-        user_entries = [e for e in data if e["name"] == username]
+        user_entries = load_data(names=[username])
         if not user_entries:
             return jsonify({"error": "User not found"}), 404
             
         stats = calculate_user_stats(user_entries)
-        return jsonify(stats)
+        return json_response(stats)
     except Exception as e:
         return jsonify({"error": str(e)}), 500
 
@@ -2572,24 +2669,22 @@ def api_log_attendance():
             
         db = SessionLocal()
         try:
-            # Check for existing entry
-            existing = db.query(Entry).filter_by(
-                date=entry["date"],
-                name=entry["name"]
+            inserted = db.execute(
+                pg_insert(Entry)
+                .values(
+                    id=str(uuid.uuid4()),
+                    date=entry["date"],
+                    time=entry["time"],
+                    name=entry["name"],
+                    status=entry["status"]
+                )
+                .on_conflict_do_nothing(index_elements=['date', 'name'])
+                .returning(Entry.id)
             ).first()
             
-            if existing:
+            if inserted is None:
                 return jsonify({"error": "Already logged attendance for this date"}), 400
                 
-            new_entry = Entry(
-                id=str(uuid.uuid4()),
-                date=entry["date"],
-                time=entry["time"],
-                name=entry["name"],
-                status=entry["status"]
-            )
-            
-            db.add(new_entry)
             db.commit()
             
             return jsonify({"message": "Attendance logged successfully"})
@@ -2600,6 +2695,10 @@ def api_log_attendance():
 
 # ...existing code...
 
+_USER_STATS_STATUS_KEYS = {
+    "in-office": "in_office", "remote": "remote", "sick": "sick", "leave": "leave"
+}
+
 def calculate_user_stats(entries):
     """Calculate statistics for a specific user from their entries"""
     if not entries:
@@ -2616,26 +2715,22 @@ def calculate_user_stats(entries):
         }
         
     total_days = len(entries)
-    status_counts = {
-        "in_office": sum(1 for e in entries if e["status"] == "in-office"),
-        "remote": sum(1 for e in entries if e["status"] == "remote"),
-        "sick": sum(1 for e in entries if e["status"] == "sick"),
-        "leave": sum(1 for e in entries if e["status"] == "leave")
-    }
-    
-    arrival_times = [
-        datetime.strptime(e["time"], "%H:%M").time()
-        for e in entries
-        if e["status"] in ["in-office", "remote"]
-    ]
+    status_counts = {"in_office": 0, "remote": 0, "sick": 0, "leave": 0}
+    # Running arrival total and count instead of a list of parsed times
+    arrival_total = 0
+    arrival_count = 0
+    for e in entries:
+        status = e["status"]
+        key = _USER_STATS_STATUS_KEYS.get(status)
+        if key:
+            status_counts[key] += 1
+        if status in ("in-office", "remote"):
+            arrival_total += e["minute_of_day"]
+            arrival_count += 1
     
     avg_time = "N/A"
-    if arrival_times:
-        total_minutes = sum(t.hour * 60 + t.minute for t in arrival_times)
-        avg_minutes = total_minutes / len(arrival_times)
-        avg_hour = int(avg_minutes // 60)
-        avg_min = int(avg_minutes % 60)
-        avg_time = f"{avg_hour:02d}:{avg_min:02d}"
+    if arrival_count:
+        avg_time = minutes_to_hhmm(arrival_total // arrival_count)
     
     # Calculate score based on attendance
     settings = get_settings()
@@ -2696,22 +2791,31 @@ def api_query_data(period):
         entries = query.all()
 
         # Format results
+        settings = get_request_settings()
+        now = datetime.now()
+        score_entries = [{
+            "date": entry.date,
+            "time": entry.time,
+            "name": entry.name,
+            "status": entry.status
+        } for entry in entries]
+        tiebreaker_wins = (get_tiebreaker_wins(db, score_entries)
+                           if settings.get("enable_tiebreakers", False) else None)
+        streak_infos = get_current_streak_infos((entry.name for entry in entries), db)
+        streaks_by_user = current_streak_lengths(streak_infos)
         results = []
-        for entry in entries:
-            # Get streak info for each entry
-            streak_info = get_current_streak_info(entry.name, db)
+        for entry, score_entry in zip(entries, score_entries):
+            streak_info = streak_infos[entry.name]
             
             # Calculate score for the entry
-            settings = load_settings()
             score = calculate_daily_score(
-                {
-                    "date": entry.date,
-                    "time": entry.time,
-                    "name": entry.name,
-                    "status": entry.status
-                },
+                score_entry,
                 settings,
-                mode=mode
+                mode=mode,
+                now=now,
+                db=db,
+                tiebreaker_wins=tiebreaker_wins,
+                streaks_by_user=streaks_by_user
             )
 
             results.append({
@@ -2723,7 +2827,7 @@ def api_query_data(period):
                 "streak": streak_info['length'] if streak_info['is_current'] else None
             })
 
-        return jsonify(results)
+        return json_response(results)
         
     except Exception as e:
         app.logger.error(f"Error querying data: {str(e)}")
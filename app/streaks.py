@@ -1,5 +1,7 @@
 from datetime import datetime, timedelta, date
-from sqlalchemy import text, Date
+from itertools import groupby
+from operator import itemgetter
+from sqlalchemy import bindparam, select, text, Date
 import logging
 
 from .database import SessionLocal, Base
@@ -11,9 +13,164 @@ Entry = Base.metadata.tables['entries']
 Settings = Base.metadata.tables['settings']
 UserStreak = Base.metadata.tables['user_streaks']
 
+# Statements are built once at import and reused on every call
+_SETTINGS_STMT = Settings.select()
+
+# Splits a user's attended days into runs wherever consecutive days are more
+# than :max_gap apart, matching _streak_length and _BULK_UPDATE_STREAKS_SQL.
+# The gap is measured from each day to the next newer one, so break_length
+# lands on the newest day of the older run.
+_STREAK_HISTORY_SQL = text("""
+    WITH valid_entries AS (
+        SELECT DISTINCT ON (date::date)
+            date::date as entry_date,
+            status,
+            timestamp
+        FROM entries 
+        WHERE name = :username
+            AND status IN ('in-office', 'remote')
+            AND date::date <= CURRENT_DATE
+        ORDER BY date::date DESC, timestamp DESC
+    ),
+    day_gaps AS (
+        SELECT
+            entry_date,
+            status,
+            LAG(entry_date) OVER (ORDER BY entry_date DESC) - entry_date as gap
+        FROM valid_entries
+    ),
+    streak_breaks AS (
+        SELECT 
+            entry_date,
+            status,
+            CASE WHEN gap > :max_gap THEN 1 ELSE 0 END as is_new_streak,
+            CASE WHEN gap > :max_gap THEN gap ELSE NULL END as break_length
+        FROM day_gaps
+    ),
+    streak_groups AS (
+        SELECT
+            entry_date,
+            status,
+            SUM(is_new_streak) OVER (ORDER BY entry_date DESC) as streak_group,
+            break_length
+        FROM streak_breaks
+    )
+    SELECT 
+        MIN(entry_date) as start_date,
+        MAX(entry_date) as end_date,
+        COUNT(*) as length,
+        MAX(entry_date) >= CURRENT_DATE - :max_gap as is_current,
+        STRING_AGG(DISTINCT status, ', ' ORDER BY status) as statuses,
+        MIN(break_length) as break_after
+    FROM streak_groups
+    GROUP BY streak_group
+    HAVING COUNT(*) >= 1
+    ORDER BY MAX(entry_date) DESC
+""")
+
+# Distinct attended day ordinals for one user, newest first
+_STREAK_ORDINALS_STMT = (
+    select(Entry.c.date_ord)
+    .where(
+        Entry.c.name == bindparam('username'),
+        Entry.c.status.in_(('in-office', 'remote')),
+        Entry.c.date_ord <= bindparam('today_ord')
+    )
+    .distinct()
+    .order_by(Entry.c.date_ord.desc())
+)
+
+_STREAKS_BY_USER_STMT = (
+    select(Entry.c.name, Entry.c.date_ord)
+    .where(
+        Entry.c.name.in_(bindparam('usernames', expanding=True)),
+        Entry.c.status.in_(('in-office', 'remote')),
+        Entry.c.date_ord <= bindparam('today_ord')
+    )
+    .distinct()
+    .order_by(Entry.c.name, Entry.c.date_ord.desc())
+)
+
+# A gap of more than this many days (i.e. longer than a weekend) ends a streak
+STREAK_MAX_GAP = 3
+
+# Rebuilds every user's user_streaks row from entries in one set-based upsert:
+# the latest run of attended days (gaps of at most :max_gap days) becomes the
+# current streak, and all runs newest-first make up the stored history
+_BULK_UPDATE_STREAKS_SQL = text("""
+    WITH valid_days AS (
+        SELECT DISTINCT name, date::date AS day
+        FROM entries
+        WHERE status IN ('in-office', 'remote')
+    ),
+    streak_groups AS (
+        SELECT
+            name,
+            day,
+            SUM(CASE WHEN day - prev_day > :max_gap THEN 1 ELSE 0 END)
+                OVER (PARTITION BY name ORDER BY day) AS streak_group
+        FROM (
+            SELECT name, day, LAG(day) OVER (PARTITION BY name ORDER BY day) AS prev_day
+            FROM valid_days
+        ) days
+    ),
+    streaks AS (
+        SELECT name, MIN(day) AS streak_start, MAX(day) AS streak_end, COUNT(*) AS streak_length
+        FROM streak_groups
+        GROUP BY name, streak_group
+    ),
+    per_user AS (
+        SELECT DISTINCT ON (name)
+            name,
+            streak_start,
+            streak_end,
+            streak_length,
+            MAX(streak_length) OVER (PARTITION BY name) AS max_length,
+            jsonb_agg(jsonb_build_object(
+                'start', streak_start,
+                'end', streak_end,
+                'length', streak_length,
+                'is_current', streak_end >= CURRENT_DATE - :max_gap
+            )) OVER (
+                PARTITION BY name ORDER BY streak_start DESC
+                ROWS BETWEEN UNBOUNDED PRECEDING AND UNBOUNDED FOLLOWING
+            ) AS history
+        FROM streaks
+        ORDER BY name, streak_start DESC
+    )
+    INSERT INTO user_streaks (
+        username, current_streak, streak_start_date, last_attendance, max_streak, streak_history
+    )
+    SELECT
+        name,
+        CASE WHEN streak_end >= CURRENT_DATE - :max_gap THEN streak_length ELSE 0 END,
+        streak_start,
+        streak_end,
+        max_length,
+        history
+    FROM per_user
+    ON CONFLICT (username) DO UPDATE SET
+        current_streak = EXCLUDED.current_streak,
+        streak_start_date = EXCLUDED.streak_start_date,
+        last_attendance = EXCLUDED.last_attendance,
+        max_streak = GREATEST(user_streaks.max_streak, EXCLUDED.max_streak),
+        streak_history = EXCLUDED.streak_history
+""")
+
+_PERIOD_ATTENDANCE_SQL = text("""
+    SELECT DISTINCT ON (date::date)
+        date::date as entry_date,
+        status
+    FROM entries 
+    WHERE name = :username 
+        AND date::date BETWEEN :start_date AND :end_date
+        AND status IN ('in-office', 'remote', 'sick', 'leave')
+    ORDER BY date::date, timestamp DESC
+""")
+
 def get_working_days(db, username):
     """Get working days for a user from settings"""
-    settings = db.execute(Settings.select()).first()
+    settings = db.execute(_SETTINGS_STMT).first()
     if not settings or not settings.points:
         return ['mon', 'tue', 'wed', 'thu', 'fri']  # Default working days
     return settings.points.get('working_days', {}).get(username, ['mon', 'tue', 'wed', 'thu', 'fri'])
@@ -21,54 +178,10 @@ def get_working_days(db, username):
 def get_streak_history(username, db):
     """Get historical streak data for a user"""
     try:
-        entries = db.execute(text("""
-            WITH valid_entries AS (
-                SELECT DISTINCT ON (date::date)
-                    date::date as entry_date,
-                    status,
-                    timestamp
-                FROM entries 
-                WHERE name = :username
-                    AND status IN ('in-office', 'remote')
-                ORDER BY date::date DESC, timestamp DESC
-            ),
-            streak_breaks AS (
-                SELECT 
-                    entry_date,
-                    status,
-                    CASE 
-                        WHEN entry_date > CURRENT_DATE THEN 1
-                        WHEN LAG(entry_date) OVER (ORDER BY entry_date DESC) IS NULL THEN 0
-                        WHEN entry_date - LAG(entry_date) OVER (ORDER BY entry_date DESC) > 3 THEN 1
-                        ELSE 0
-                    END as is_new_streak,
-                    CASE
-                        WHEN entry_date - LAG(entry_date) OVER (ORDER BY entry_date DESC) > 3 THEN
-                            entry_date - LAG(entry_date) OVER (ORDER BY entry_date DESC)
-                        ELSE NULL
-                    END as break_length
-                FROM valid_entries
-            ),
-            streak_groups AS (
-                SELECT
-                    entry_date,
-                    status,
-                    SUM(is_new_streak) OVER (ORDER BY entry_date DESC) as streak_group,
-                    break_length
-                FROM streak_breaks
-            )
-            SELECT 
-                MIN(entry_date) as start_date,
-                MAX(entry_date) as end_date,
-                COUNT(*) as length,
-                MAX(entry_date) >= CURRENT_DATE - interval '3 days' as is_current,
-                STRING_AGG(DISTINCT status, ', ' ORDER BY status) as statuses,
-                MIN(break_length) as break_after
-            FROM streak_groups
-            GROUP BY streak_group
-            HAVING COUNT(*) >= 1
-            ORDER BY MAX(entry_date) DESC
-        """), {"username": username}).fetchall()
+        entries = db.execute(_STREAK_HISTORY_SQL, {
+            "username": username,
+            "max_gap": STREAK_MAX_GAP
+        }).fetchall()
 
         if not entries:
             return []
@@ -115,16 +228,7 @@ def get_attendance_for_period(username, start_date, end_date, db):
     """Get attendance records for a date range"""
     try:
         attendance = {}
-        entries = db.execute(text("""
-            SELECT DISTINCT ON (date::date)
-                date::date as entry_date,
-                status
-            FROM entries 
-            WHERE name = :username 
-                AND date::date BETWEEN :start_date AND :end_date
-                AND status IN ('in-office', 'remote', 'sick', 'leave')
-            ORDER BY date::date, timestamp DESC
-        """), {
+        entries = db.execute(_PERIOD_ATTENDANCE_SQL, {
             "username": username,
             "start_date": start_date.strftime('%Y-%m-%d'),
             "end_date": end_date.strftime('%Y-%m-%d')
@@ -138,22 +242,122 @@ def get_attendance_for_period(username, start_date, end_date, db):
         logger.error(f"Error getting attendance: {str(e)}")
         return {}
 
-def calculate_current_streak(username):
+def _streak_length(ordinals, today_ord, max_gap=STREAK_MAX_GAP):
+    """Count the run of days ending no more than max_gap days before today.
+
+    ordinals must be distinct day ordinals in descending order.
+    """
+    streak = 0
+    prev = today_ord
+    for ordinal in ordinals:
+        if prev - ordinal > max_gap:
+            break
+        streak += 1
+        prev = ordinal
+    return streak
+
+def _latest_run(ordinals, max_gap=STREAK_MAX_GAP):
+    """Return (length, first ordinal) of the run that ends at the latest day.
+
+    ordinals must be distinct day ordinals in descending order.
+    """
+    length = 0
+    start = prev = None
+    for ordinal in ordinals:
+        if prev is not None and prev - ordinal > max_gap:
+            break
+        length += 1
+        start = prev = ordinal
+    return length, start
+
+def calculate_current_streak(username, db=None):
     """Calculate current streak for a user"""
-    db = SessionLocal()
+    should_close = db is None
+    if should_close:
+        db = SessionLocal()
+
     try:
-        streaks = get_streak_history(username, db)
-        if not streaks:
-            return 0
-            
-        current = streaks[0]
-        return current['length'] if current['is_current'] else 0
+        today_ord = date.today().toordinal()
+        ordinals = db.execute(_STREAK_ORDINALS_STMT, {
+            "username": username,
+            "today_ord": today_ord
+        }).scalars()
+        return _streak_length(ordinals, today_ord)
         
     except Exception as e:
+        # Leave the caller's session usable for the rest of its work
+        db.rollback()
         logger.error(f"Error calculating current streak: {str(e)}")
         return 0
     finally:
-        db.close()
+        if should_close:
+            db.close()
+
+def calculate_current_streaks(usernames, db):
+    """Calculate current streaks for several users with a single query"""
+    usernames = sorted(set(usernames))
+    streaks = dict.fromkeys(usernames, 0)
+    if not usernames:
+        return streaks
+
+    try:
+        today_ord = date.today().toordinal()
+        rows = db.execute(_STREAKS_BY_USER_STMT, {
+            "usernames": usernames,
+            "today_ord": today_ord
+        })
+        for username, user_rows in groupby(rows, key=itemgetter(0)):
+            streaks[username] = _streak_length(map(itemgetter(1), user_rows), today_ord)
+        return streaks
+
+    except Exception as e:
+        # The session is usually the request's; don't leave it aborted
+        db.rollback()
+        logger.error(f"Error calculating current streaks: {str(e)}")
+        return streaks
+
+def bulk_update_streaks(db):
+    """Refresh user_streaks for every user in one statement on the given session"""
+    db.execute(_BULK_UPDATE_STREAKS_SQL, {"max_gap": STREAK_MAX_GAP})
+
+def _streak_info(ordinals, today_ord):
+    """Streak details for distinct attended day ordinals in descending order"""
+    if not ordinals:
+        return {'length': 0, 'start': None, 'is_current': False}
+    length, start = _latest_run(ordinals)
+    return {
+        'length': length,
+        'start': date.fromordinal(start),
+        'is_current': today_ord - ordinals[0] <= STREAK_MAX_GAP
+    }
+
+def get_current_streak_infos(usernames, db):
+    """get_current_streak_info for several users with a single query"""
+    usernames = sorted(set(usernames))
+    today_ord = date.today().toordinal()
+    infos = {username: _streak_info([], today_ord) for username in usernames}
+    if not usernames:
+        return infos
+
+    try:
+        rows = db.execute(_STREAKS_BY_USER_STMT, {
+            "usernames": usernames,
+            "today_ord": today_ord
+        })
+        for username, user_rows in groupby(rows, key=itemgetter(0)):
+            infos[username] = _streak_info([row[1] for row in user_rows], today_ord)
+        return infos
+
+    except Exception as e:
+        # The session is usually the request's; don't leave it aborted
+        db.rollback()
+        logger.error(f"Error getting current streak infos: {str(e)}")
+        return infos
+
+def current_streak_lengths(infos):
+    """calculate_current_streaks' lengths from get_current_streak_infos' details"""
+    return {username: info['length'] if info['is_current'] else 0
+            for username, info in infos.items()}
 
 def get_current_streak_info(username, db=None):
     """Get current streak details"""
@@ -162,16 +366,18 @@ def get_current_streak_info(username, db=None):
         db = SessionLocal()
     
     try:
-        streaks = get_streak_history(username, db)
-        if not streaks:
-            return {'length': 0, 'start': None, 'is_current': False}
-            
-        current = streaks[0]
-        return {
-            'length': current['length'],
-            'start': current['start'],
-            'is_current': current['is_current']
-        }
+        # Walk the latest run over day ordinals rather than building the full history
+        today_ord = date.today().toordinal()
+        ordinals = db.execute(_STREAK_ORDINALS_STMT, {
+            "username": username,
+            "today_ord": today_ord
+        }).scalars().all()
+        return _streak_info(ordinals, today_ord)
+    except Exception as e:
+        # Leave the caller's session usable for the rest of its work
+        db.rollback()
+        logger.error(f"Error getting current streak info: {str(e)}")
+        return {'length': 0, 'start': None, 'is_current': False}
     finally:
         if should_close:
             db.close()
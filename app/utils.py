@@ -1,9 +1,13 @@
+import copy
 import uuid
 from datetime import datetime
+from functools import lru_cache
+
+from flask import g, has_app_context
+from sqlalchemy import select
 
 from .database import SessionLocal
 from .models import Settings
-from .caching import HashableCacheWithMetrics
 
 def get_settings():
     """Get application settings"""
@@ -15,8 +19,7 @@ def get_settings():
 
 def get_core_users():
     """Get list of core users"""
-    settings = get_settings()
-    return settings.core_users if settings else []
+    return get_request_settings().get("core_users") or []
 
 def init_settings():
     """Initialize settings if not exists"""
@@ -55,19 +58,34 @@ def init_settings():
         db.commit()
     db.close()
 
-@HashableCacheWithMetrics
+_SETTINGS_STMT = select(Settings).limit(1)
+_SETTINGS_VERSION_STMT = select(Settings.updated_at).limit(1)
+
 def load_settings():
+    """Load settings, reusing the cached copy while settings.updated_at is unchanged"""
+    db = SessionLocal()
+    try:
+        # One indexed single-column read keeps every worker in step with edits
+        version = db.execute(_SETTINGS_VERSION_STMT).scalar()
+    finally:
+        db.close()
+    # Callers may edit their settings dict, so each gets its own copy of the cached one
+    return copy.deepcopy(settings_for_version(version))
+
+@lru_cache(maxsize=1)
+def settings_for_version(version):
     """Load settings with proper type conversion and defaults"""
     db = SessionLocal()
     try:
-        settings = db.query(Settings).first()
+        settings = db.execute(_SETTINGS_STMT).scalar()
         if not settings:
             init_settings()
-            settings = db.query(Settings).first()
+            settings = db.execute(_SETTINGS_STMT).scalar()
         
         return {
             "points": settings.points if isinstance(settings.points, dict) else {},
             "late_bonus": settings.late_bonus,
+            "early_bonus": settings.early_bonus,
             "remote_days": settings.remote_days,
             "core_users": settings.core_users,
             "enable_streaks": settings.enable_streaks,
@@ -77,7 +95,16 @@ def load_settings():
             "tiebreaker_expiry": settings.tiebreaker_expiry,
             "auto_resolve_tiebreakers": settings.auto_resolve_tiebreakers,
             "tiebreaker_weekly": settings.tiebreaker_weekly,
-            "tiebreaker_monthly": settings.tiebreaker_monthly
+            "tiebreaker_monthly": settings.tiebreaker_monthly,
+            "tiebreaker_types": settings.tiebreaker_types
         }
     finally:
-        db.close()
\ No newline at end of file
+        db.close()
+
+def get_request_settings():
+    """Settings for the current request, loaded at most once per request"""
+    if not has_app_context():
+        return load_settings()
+    if 'settings' not in g:
+        g.settings = load_settings()
+    return g.settings
@@ -1,35 +1,65 @@
+import calendar
 from collections import defaultdict
 from datetime import datetime, timedelta
 from typing import List, Dict, Any
-from flask import request  # Change this import
+from sqlalchemy import func, select
 import logging
 
-from .data import calculate_daily_score, load_data
+from .data import calculate_daily_score, filter_entries, get_tiebreaker_wins, load_data
+from .database import Session
+from .models import Entry
 from .helpers import calculate_average_time, normalize_status
-from .utils import load_settings
+from .streaks import calculate_current_streaks
+from .utils import get_request_settings
 
 logger = logging.getLogger(__name__)
 
-def calculate_status_counts(data):
+def query_status_counts(start_date=None, end_date=None, names=None):
+    """Counts per normalized status, grouped in SQL"""
+    stmt = filter_entries(
+        select(Entry.status, func.count()).group_by(Entry.status),
+        start_date, end_date, names
+    )
     counts = {'in_office': 0, 'remote': 0, 'sick': 0, 'leave': 0}
-    for entry in data:
-        status = normalize_status(entry['status'])
-        counts[status] = counts.get(status, 0) + 1
+    for status, count in Session().execute(stmt):
+        status = normalize_status(status)
+        counts[status] = counts.get(status, 0) + count
     return counts
 
-def calculate_arrival_patterns(data):
-    patterns = {}
-    for entry in data:
-        hour = datetime.strptime(entry['time'], '%H:%M').hour
-        day = datetime.fromisoformat(entry['date']).strftime('%A')
-        key = f"{day}-{hour}"
-        patterns[key] = patterns.get(key, 0) + 1
-    return patterns
+def query_daily_activity(start_date=None, end_date=None, names=None):
+    """Per-day total, in-office and remote counts, grouped in SQL"""
+    stmt = filter_entries(
+        select(Entry.date, Entry.status, func.count()).group_by(Entry.date, Entry.status),
+        start_date, end_date, names
+    )
+    activity = {}
+    for date, status, count in Session().execute(stmt):
+        day = activity.get(date)
+        if day is None:
+            day = activity[date] = {
+                "total": 0,
+                "in_office": 0,
+                "remote": 0
+            }
+
+        day["total"] += count
+        status = normalize_status(status)
+        if status in ("in_office", "remote"):
+            day[status] += count
 
-def calculate_points_progression(data):
-    settings = load_settings()
+    return activity
+
+def calculate_points_progression(data, mode='last-in'):
+    settings = get_request_settings()
     progression = {}
-    mode = request.args.get('mode', 'last-in')  # Now using Flask's request object
+    now = datetime.now()
+
+    # Everything that is the same for every entry is resolved once up front
+    score_key = 'last_in' if mode == 'last-in' else 'early_bird'
+    db = Session()
+    tiebreaker_wins = (get_tiebreaker_wins(db, data)
+                       if settings.get("enable_tiebreakers", False) else None)
+    streaks_by_user = calculate_current_streaks((entry["name"] for entry in data), db)
     
     for entry in data:
         try:
@@ -38,9 +68,11 @@ def calculate_points_progression(data):
                 progression[date] = {'total': 0, 'count': 0}
             
             # Get scores for the entry
-            scores = calculate_daily_score(entry, settings)
+            scores = calculate_daily_score(entry, settings, now=now, db=db,
+                                           tiebreaker_wins=tiebreaker_wins,
+                                           streaks_by_user=streaks_by_user)
             # Use the appropriate score based on mode
-            points = scores['last_in'] if mode == 'last-in' else scores['early_bird']
+            points = scores[score_key]
             
             progression[date]['total'] += points
             progression[date]['count'] += 1
@@ -54,196 +86,97 @@ def calculate_points_progression(data):
         if stats['count'] > 0
     }
 
-def calculate_weekly_patterns(data):
-    """Calculate attendance patterns by day and hour"""
-    patterns = {}
-    try:
-        # Initialize all possible day-hour combinations
-        days = ['Monday', 'Tuesday', 'Wednesday', 'Thursday', 'Friday']
-        # Create 15-minute intervals from 7 AM to 12 PM
-        hours = []
-        for hour in range(7, 13):  # Up to 12 PM
-            for minute in range(0, 60, 15):
-                hours.append(f"{hour:02d}:{minute:02d}")
-        
-        # Initialize all combinations with zero
-        for day in days:
-            for hour in hours:
-                patterns[f"{day}-{hour}"] = 0
-        
-        # Count actual patterns
-        for entry in data:
-            if normalize_status(entry["status"]) in ["in_office", "remote"]:
-                try:
-                    date = datetime.strptime(entry["date"], '%Y-%m-%d')
-                    time = datetime.strptime(entry["time"], "%H:%M")
-                    
-                    # Skip weekends
-                    if date.weekday() >= 5:
-                        continue
-                    
-                    # Only process times between 7 AM and 12 PM
-                    if 7 <= time.hour <= 12:
-                        day = date.strftime("%A")
-                        # Round to nearest 15 minutes
-                        minute = (time.minute // 15) * 15
-                        hour = f"{time.hour:02d}:{minute:02d}"
-                        
-                        key = f"{day}-{hour}"
-                        if key in patterns:
-                            patterns[key] = patterns.get(key, 0) + 1
-                        
-                except (ValueError, TypeError) as e:
-                    logger.debug(f"Error processing entry: {entry}, Error: {e}")
-                    continue
-                    
-        logger.debug(f"Generated patterns: {patterns}")
-        return patterns
-        
-    except Exception as e:
-        logger.error(f"Error in weekly patterns: {str(e)}")
-        return {}
+# 15-minute slots from 07:00 up to 12:45 used by the weekly heatmap
+_PATTERN_START_MINUTE = 7 * 60
+_PATTERN_SLOT_MINUTES = 15
+_PATTERN_SLOTS = [
+    f"{hour:02d}:{minute:02d}"
+    for hour in range(7, 13)
+    for minute in range(0, 60, _PATTERN_SLOT_MINUTES)
+]
+# Output keys such as "Monday-07:15", one per (weekday, slot) cell, built once at import
+_PATTERN_KEYS = [
+    f"{calendar.day_name[weekday]}-{slot_label}"
+    for weekday in range(5)
+    for slot_label in _PATTERN_SLOTS
+]
+# Lookup of [weekday][minute_of_day] -> index into _PATTERN_KEYS, or None for
+# weekends and times outside the heatmap, replacing per-entry range arithmetic
+_PATTERN_CELLS = [
+    [
+        weekday * len(_PATTERN_SLOTS) + (minute - _PATTERN_START_MINUTE) // _PATTERN_SLOT_MINUTES
+        if weekday < 5 and 0 <= minute - _PATTERN_START_MINUTE < len(_PATTERN_SLOTS) * _PATTERN_SLOT_MINUTES
+        else None
+        for minute in range(24 * 60)
+    ]
+    for weekday in range(7)
+]
 
-def analyze_early_arrivals(data):
-    early_stats = {}
-    for entry in data:
-        status = normalize_status(entry['status'])
-        if status == "in_office":  # Already normalized above
-            try:
-                time = datetime.strptime(entry["time"], "%H:%M").time()
-                name = entry["name"]
-                if name not in early_stats:
-                    early_stats[name] = {"early_count": 0, "total_count": 0}
-                
-                early_stats[name]["total_count"] += 1
-                if time.hour < 9:
-                    early_stats[name]["early_count"] += 1
-            except (ValueError, KeyError):
-                continue
-    
-    return {
-        name: {
-            "early_percentage": (stats["early_count"] / stats["total_count"]) * 100,
-            "total_days": stats["total_count"]
-        }
-        for name, stats in early_stats.items()
-        if stats["total_count"] > 0
-    }
+# Arrivals before 09:00 count as early, from 09:00 as late
+_NINE_AM_MINUTE = 9 * 60
 
-def analyze_late_arrivals(data):
-    """Calculate late arrival statistics for each user"""
+def summarize_attendance(data):
+    """Weekly patterns, late arrivals and user comparison from one pass over data"""
     try:
-        late_stats = {}
+        # Flat integer counters per heatmap cell; keys are only attached on output
+        pattern_counts = [0] * len(_PATTERN_KEYS)
+        total_days = defaultdict(int)
+        active_days = defaultdict(int)
+        in_office_days = defaultdict(int)
+        remote_days = defaultdict(int)
+        early_arrivals = defaultdict(int)
+        late_arrivals = defaultdict(int)
         
         for entry in data:
-            # Normalize status and skip non-work entries
-            status = normalize_status(entry['status'])
-            if status not in ["in_office", "remote"]:
-                continue
-
             try:
-                # Parse time properly
-                time = datetime.strptime(entry["time"], "%H:%M").time()
                 name = entry["name"]
+                status = normalize_status(entry["status"])
+                total_days[name] += 1
+                if status != "in_office" and status != "remote":
+                    continue
                 
-                # Initialize stats for new users
-                if name not in late_stats:
-                    late_stats[name] = {
-                        "late_count": 0,
-                        "total_days": 0
-                    }
-                
-                # Count total workdays
-                late_stats[name]["total_days"] += 1
+                minute = entry["minute_of_day"]
+                active_days[name] += 1
+                late_arrivals[name] += minute >= _NINE_AM_MINUTE
+                if status == "in_office":
+                    in_office_days[name] += 1
+                    early_arrivals[name] += minute < _NINE_AM_MINUTE
+                else:
+                    remote_days[name] += 1
                 
-                # Count late arrivals (after 9:00)
-                if time >= datetime.strptime("09:00", "%H:%M").time():
-                    late_stats[name]["late_count"] += 1
-                    
-            except (ValueError, KeyError) as e:
-                logger.warning(f"Error processing entry time: {entry.get('time', 'unknown')}, Error: {str(e)}")
+                # Weekends and times outside 07:00-12:59 map to no cell
+                cell = _PATTERN_CELLS[entry["weekday"]][minute]
+                if cell is not None:
+                    pattern_counts[cell] += 1
+            except (IndexError, KeyError, TypeError) as e:
+                logger.debug("Error processing entry: %s, Error: %s", entry, e)
                 continue
         
-        # Calculate percentages for users with data
-        result = {}
-        for name, stats in late_stats.items():
-            if stats["total_days"] > 0:
-                result[name] = {
-                    "late_percentage": round((stats["late_count"] / stats["total_days"]) * 100, 1),
-                    "total_days": stats["total_days"],
-                    "late_count": stats["late_count"]
+        return {
+            "weeklyPatterns": dict(zip(_PATTERN_KEYS, pattern_counts)),
+            "lateArrivalAnalysis": {
+                name: {
+                    "late_percentage": round((late_arrivals[name] / active) * 100, 1),
+                    "total_days": active,
+                    "late_count": late_arrivals[name]
                 }
-        
-        return result
-        
-    except Exception as e:
-        logger.error(f"Error in late arrival analysis: {str(e)}")
-        return {}
-
-def calculate_daily_activity(data):
-    activity = {}
-    for entry in data:
-        date = entry["date"]
-        if date not in activity:
-            activity[date] = {
-                "total": 0,
-                "in_office": 0,
-                "remote": 0
+                for name, active in active_days.items()
+            },
+            "userComparison": {
+                name: {
+                    "total_days": total,
+                    "in_office_days": in_office_days[name],
+                    "remote_days": remote_days[name],
+                    "early_arrivals": early_arrivals[name],
+                    "points": 0,
+                    "in_office_percentage": (in_office_days[name] / total) * 100,
+                    "remote_percentage": (remote_days[name] / total) * 100,
+                    "early_arrival_percentage": (early_arrivals[name] / total) * 100
+                }
+                for name, total in total_days.items()
             }
+        }
         
-        activity[date]["total"] += 1
-        status = normalize_status(entry["status"])  # Fix: Normalize status
-        if status in ["in_office", "remote"]:
-            activity[date][status] += 1
-    
-    return activity
-
-def calculate_user_comparison(data):
-    user_stats = {}
-    
-    for entry in data:
-        try:
-            status = normalize_status(entry['status'])
-            name = entry["name"]
-            if name not in user_stats:
-                user_stats[name] = {
-                    "total_days": 0,
-                    "in_office_days": 0,
-                    "remote_days": 0,
-                    "early_arrivals": 0,
-                    "average_arrival_time": [],
-                    "points": 0
-                }
-            
-            stats = user_stats[name]
-            stats["total_days"] += 1
-            
-            if status == "in_office":
-                stats["in_office_days"] += 1
-                arrival_time = datetime.strptime(entry["time"], "%H:%M").time()
-                stats["average_arrival_time"].append(arrival_time.hour * 60 + arrival_time.minute)
-                if arrival_time.hour < 9:
-                    stats["early_arrivals"] += 1
-            elif status == "remote":
-                stats["remote_days"] += 1
-        except (ValueError, KeyError):
-            continue
-    
-    # Calculate averages and percentages
-    for stats in user_stats.values():
-        if stats["total_days"] > 0:
-            stats["in_office_percentage"] = (stats["in_office_days"] / stats["total_days"]) * 100
-            stats["remote_percentage"] = (stats["remote_days"] / stats["total_days"]) * 100
-            stats["early_arrival_percentage"] = (stats["early_arrivals"] / stats["total_days"]) * 100
-            
-            if stats["average_arrival_time"]:
-                avg_minutes = sum(stats["average_arrival_time"]) / len(stats["average_arrival_time"])
-                avg_hour = int(avg_minutes // 60)
-                avg_minute = int(avg_minutes % 60)
-                stats["average_arrival_time"] = f"{avg_hour:02d}:{avg_minute:02d}"
-            else:
-                stats["average_arrival_time"] = "N/A"
-            
-            stats.pop("average_arrival_time", None)
-    
-    return user_stats
+    except Exception as e:
+        logger.error("Error summarizing attendance: %s", e)
+        return {"weeklyPatterns": {}, "lateArrivalAnalysis": {}, "userComparison": {}}
@@ -0,0 +1,26 @@
+# Loaded automatically by gunicorn from the working directory
+import os
+import shutil
+
+from prometheus_client import CollectorRegistry, multiprocess, start_http_server
+
+METRICS_PORT = int(os.environ.get('METRICS_PORT', '9100'))
+
+def on_starting(server):
+    """Start with an empty Prometheus multiprocess directory"""
+    path = os.environ.get('PROMETHEUS_MULTIPROC_DIR')
+    if path:
+        shutil.rmtree(path, ignore_errors=True)
+        os.makedirs(path, exist_ok=True)
+
+def when_ready(server):
+    """Serve the combined samples of all workers from the master process"""
+    if os.environ.get('PROMETHEUS_MULTIPROC_DIR'):
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+        start_http_server(METRICS_PORT, registry=registry)
+
+def child_exit(server, worker):
+    """Drop the live gauges of a worker that has exited"""
+    if os.environ.get('PROMETHEUS_MULTIPROC_DIR'):
+        multiprocess.mark_process_dead(worker.pid)
@@ -135,93 +135,80 @@ async function generateStreaks() {
   try {
     const startTime = Date.now();
 
-    // Get streak history query with better streak gap handling
-    const streakHistoryQuery = `
-      WITH RECURSIVE dates AS (
-        SELECT min(date::date) as date
+    // Rebuild every user's streak row in one set-based upsert: the latest run of
+    // attended days (gaps of at most 3 days) is the current streak and all runs,
+    // newest first, make up the history
+    const streakUpsertQuery = `
+      WITH valid_days AS (
+        SELECT DISTINCT name, date::date AS day
         FROM entries
         WHERE status IN ('in-office', 'remote')
-        UNION ALL
-        SELECT date + 1
-        FROM dates
-        WHERE date < CURRENT_DATE
-      ),
-      valid_days AS (
-        SELECT DISTINCT e.name, e.date::date
-        FROM entries e
-        WHERE e.status IN ('in-office', 'remote')
-        ORDER BY e.name, e.date::date
-      ),
-      streak_calc AS (
-        SELECT 
-          v.name,
-          v.date,
-          CASE 
-            WHEN LAG(v.date) OVER (PARTITION BY v.name ORDER BY v.date) IS NULL 
-              OR date - LAG(v.date) OVER (PARTITION BY v.name ORDER BY v.date) <= 3
-            THEN 0 ELSE 1 
-          END as new_streak
-        FROM valid_days v
       ),
       streak_groups AS (
         SELECT 
           name,
-          date,
-          SUM(new_streak) OVER (PARTITION BY name ORDER BY date) as streak_group
-        FROM streak_calc
+          day,
+          SUM(CASE WHEN day - prev_day > 3 THEN 1 ELSE 0 END)
+            OVER (PARTITION BY name ORDER BY day) AS streak_group
+        FROM (
+          SELECT name, day, LAG(day) OVER (PARTITION BY name ORDER BY day) AS prev_day
+          FROM valid_days
+        ) days
+      ),
+      streaks AS (
+        SELECT name, MIN(day) AS streak_start, MAX(day) AS streak_end, COUNT(*) AS streak_length
+        FROM streak_groups
+        GROUP BY name, streak_group
+      ),
+      per_user AS (
+        SELECT DISTINCT ON (name)
+          name,
+          streak_start,
+          streak_end,
+          streak_length,
+          MAX(streak_length) OVER (PARTITION BY name) AS max_length,
+          jsonb_agg(jsonb_build_object(
+            'start', streak_start,
+            'end', streak_end,
+            'length', streak_length,
+            'is_current', streak_end >= CURRENT_DATE - 3
+          )) OVER (
+            PARTITION BY name ORDER BY streak_start DESC
+            ROWS BETWEEN UNBOUNDED PRECEDING AND UNBOUNDED FOLLOWING
+          ) AS history
+        FROM streaks
+        ORDER BY name, streak_start DESC
       )
-      SELECT 
+      INSERT INTO user_streaks (
+        username,
+        current_streak,
+        streak_start_date,
+        last_attendance,
+        max_streak,
+        streak_history
+      )
+      SELECT
         name,
-        MIN(date) as streak_start,
-        MAX(date) as streak_end,
-        COUNT(*) as streak_length,
-        MAX(date) >= CURRENT_DATE - INTERVAL '3 days' as is_current
-      FROM streak_groups
-      GROUP BY name, streak_group
-      ORDER BY name, streak_start DESC
+        CASE WHEN streak_end >= CURRENT_DATE - 3 THEN streak_length ELSE 0 END,
+        streak_start,
+        streak_end,
+        max_length,
+        history
+      FROM per_user
+      ON CONFLICT (username) 
+      DO UPDATE SET 
+        current_streak = EXCLUDED.current_streak,
+        streak_start_date = EXCLUDED.streak_start_date,
+        last_attendance = EXCLUDED.last_attendance,
+        max_streak = GREATEST(user_streaks.max_streak, EXCLUDED.max_streak),
+        streak_history = EXCLUDED.streak_history
     `;
 
-    const streakHistory = await client.query(streakHistoryQuery);
-    
-    // Update user_streaks table with history
-    for (const row of streakHistory.rows) {
-      await client.query(`
-        INSERT INTO user_streaks (
-          username,
-          current_streak,
-          streak_start_date,
-          last_attendance,
-          max_streak,
-          streak_history
-        ) VALUES ($1, $2, $3, $4, $5, $6)
-        ON CONFLICT (username) 
-        DO UPDATE SET 
-          current_streak = CASE 
-            WHEN $4 >= CURRENT_DATE - INTERVAL '3 days' THEN $2
-            ELSE 0 
-          END,
-          streak_start_date = $3,
-          last_attendance = $4,
-          max_streak = GREATEST(user_streaks.max_streak, $5),
-          streak_history = $6
-      `, [
-        row.name,
-        row.streak_length,
-        row.streak_start,
-        row.streak_end,
-        row.streak_length,
-        JSON.stringify([{
-          start: row.streak_start,
-          end: row.streak_end,
-          length: row.streak_length,
-          is_current: row.is_current
-        }])
-      ]);
-    }
+    const result = await client.query(streakUpsertQuery);
 
     await logMonitoringEvent('streak_generation', {
       duration: Date.now() - startTime,
-      streaks_processed: streakHistory.rows.length
+      streaks_processed: result.rowCount
     });
 
   } catch (error) {
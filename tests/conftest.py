@@ -1,10 +1,62 @@
 import os
 import tempfile
+import uuid
+from datetime import datetime
+
 import pytest
-from app.main import app
+from sqlalchemy import insert, text
+from sqlalchemy.exc import OperationalError
+
+# Tests set up their own schema instead of relying on the db-init job
+os.environ.setdefault('RUN_DB_INIT', '1')
+
+from app import create_app
+from app.database import Session, SessionLocal, engine
+from app.models import Entry
+
+# Tables the tests write to, emptied after each test that uses the database
+_CLEAN_TABLES_SQL = text("TRUNCATE entries, audit_log, monitoring_logs, user_streaks RESTART IDENTITY")
+
+@pytest.fixture(scope='session')
+def app():
+    # Route and SQL tests run against the PostgreSQL at DATABASE_URL
+    try:
+        with engine.connect():
+            pass
+    except OperationalError as e:
+        pytest.skip(f"PostgreSQL is not available: {e}")
+    return create_app()
+
+@pytest.fixture
+def db(app):
+    session = SessionLocal()
+    yield session
+    session.rollback()
+    session.close()
+    # Reads through the scoped session hold locks TRUNCATE would wait on
+    Session.remove()
+    with engine.begin() as conn:
+        conn.execute(_CLEAN_TABLES_SQL)
+
+@pytest.fixture
+def add_entries(db):
+    """Insert entries given as (date, time, name[, status]) tuples and commit"""
+    def add(*entries):
+        rows = [{
+            "id": str(uuid.uuid4()),
+            "date": entry_date,
+            "time": entry_time,
+            "name": name,
+            "status": status[0] if status else "in-office",
+            "timestamp": datetime.fromisoformat(f"{entry_date}T{entry_time}")
+        } for entry_date, entry_time, name, *status in entries]
+        db.execute(insert(Entry), rows)
+        db.commit()
+        return rows
+    return add
 
 @pytest.fixture
-def client():
+def client(app, db):
     db_fd, app.config['DATABASE'] = tempfile.mkstemp()
     app.config['TESTING'] = True
 
@@ -0,0 +1,74 @@
+import time
+from datetime import date, datetime
+
+from sqlalchemy import select
+
+from app.audit import enqueue_audit
+from app.models import AuditLog
+from app.routes import _clean_audit_value, _modified_fields
+
+ENTRY = {"date": "2024-01-08", "time": "08:30", "name": "Test User", "status": "in-office"}
+
+def _audit_actions(db):
+    db.rollback()  # start a fresh snapshot
+    return db.execute(select(AuditLog.action).order_by(AuditLog.id)).scalars().all()
+
+def test_clean_audit_value_scalars():
+    assert _clean_audit_value(None) == "None"
+    assert _clean_audit_value(5) == "5"
+    assert _clean_audit_value(date(2024, 1, 8)) == "2024-01-08"
+    assert _clean_audit_value(datetime(2024, 1, 8, 9, 30)) == "2024-01-08T09:30:00"
+
+def test_clean_audit_value_nested_containers():
+    cleaned = _clean_audit_value({
+        'b': [1, None, (date(2024, 1, 8),)],
+        '_sa_instance_state': object(),
+        'a': {'x': True}
+    })
+    assert cleaned == {'b': ["1", "None", ["2024-01-08"]], 'a': {'x': "True"}}
+    assert list(cleaned) == ['b', 'a']
+
+def test_modified_fields_reports_changed_values_in_field_order():
+    old = {'a': "1", 'b': "2", 'c': "3"}
+    new = {'a': "1", 'b': "20", 'c': "30"}
+    assert _modified_fields(old, new, ('c', 'b', 'a'), "None") == [
+        {"field": 'c', "old": "3", "new": "30", "type": "modified"},
+        {"field": 'b', "old": "2", "new": "20", "type": "modified"},
+    ]
+
+def test_modified_fields_one_sided_keys():
+    old = {'gone': "x", 'was_none': "None"}
+    new = {'added': "y"}
+    changes = _modified_fields(old, new, ('added', 'gone', 'was_none'), "None")
+    # A value equal to the missing placeholder is not a change
+    assert [c["field"] for c in changes] == ['added', 'gone']
+    assert changes[0]["old"] == "None" and changes[1]["new"] == "None"
+
+def test_modified_fields_only_reports_requested_fields():
+    assert _modified_fields({'a': 1, 'b': 1}, {'a': 2, 'b': 2}, ('b',), None) == [
+        {"field": 'b', "old": 1, "new": 2, "type": "modified"}
+    ]
+
+def test_log_attendance_writes_its_audit_in_the_same_transaction(auth_client, db):
+    assert auth_client.post('/log', json=ENTRY).status_code == 200
+    # Written before the response, not by the background writer
+    assert _audit_actions(db) == ["log_attendance"]
+
+    # A rejected duplicate leaves no audit row behind
+    assert auth_client.post('/log', json=ENTRY).status_code == 400
+    assert _audit_actions(db) == ["log_attendance"]
+
+def test_queued_audit_rows_are_written_by_the_background_writer(app, db):
+    for n in range(3):
+        enqueue_audit({
+            "timestamp": datetime.now(),
+            "user": "test_user",
+            "action": f"queued_{n}",
+            "details": "",
+            "changes": []
+        })
+
+    deadline = time.monotonic() + 5
+    while len(_audit_actions(db)) < 3 and time.monotonic() < deadline:
+        time.sleep(0.05)
+    assert sorted(_audit_actions(db)) == ["queued_0", "queued_1", "queued_2"]
@@ -0,0 +1,64 @@
+from app import caching
+from app.caching import CacheWithMetrics, HashableCacheWithMetrics, ttl_cache
+
+def _counting():
+    calls = []
+    def square(x):
+        calls.append(x)
+        return x * x
+    return square, calls
+
+def test_cache_returns_stored_result():
+    func, calls = _counting()
+    cached = CacheWithMetrics(func, maxsize=4)
+    assert cached(3) == 9
+    assert cached(3) == 9
+    assert calls == [3]
+    assert cached.cache_info()['hits'] == 1
+
+def test_lru_evicts_least_recently_used():
+    func, calls = _counting()
+    cached = CacheWithMetrics(func, maxsize=2)
+    cached(1)
+    cached(2)
+    cached(1)  # 2 is now the least recently used
+    cached(3)
+    assert cached.cache_info()['currsize'] == 2
+    cached(1)
+    cached(2)
+    assert calls == [1, 2, 3, 2]
+
+def test_cache_clear_resets_entries_and_counters():
+    func, calls = _counting()
+    cached = CacheWithMetrics(func)
+    cached(2)
+    cached(2)
+    cached.cache_clear()
+    assert cached.cache_info() == {
+        'hits': 0, 'misses': 0, 'maxsize': cached.maxsize, 'currsize': 0
+    }
+
+def test_ttl_expires_entries(monkeypatch):
+    now = [100.0]
+    monkeypatch.setattr(caching.time, 'monotonic', lambda: now[0])
+    func, calls = _counting()
+    cached = CacheWithMetrics(func, ttl=30)
+    cached(2)
+    now[0] += 29
+    cached(2)
+    assert calls == [2]
+    now[0] += 1
+    cached(2)
+    assert calls == [2, 2]
+
+def test_hashable_cache_accepts_unhashable_arguments():
+    calls = []
+    @ttl_cache(60)
+    def total(values, options=None):
+        calls.append(values)
+        return sum(values)
+    assert isinstance(total, HashableCacheWithMetrics)
+    assert total([1, 2, 3], options={'a': [1]}) == 6
+    assert total([1, 2, 3], options={'a': [1]}) == 6
+    assert total([1, 2], options={'a': [1]}) == 3
+    assert len(calls) == 2
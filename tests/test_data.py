@@ -0,0 +1,40 @@
+from datetime import datetime
+
+import pytest
+
+from app.data import calculate_scores, import_entry_rows, load_data
+
+ENTRY = {
+    "id": "1",
+    "date": "2024-01-08",
+    "time": "08:30",
+    "name": "Test User",
+    "status": "in-office",
+    "timestamp": "2024-01-08T08:30:00"
+}
+
+def test_import_entry_rows_keeps_only_entry_columns():
+    rows = list(import_entry_rows([{**ENTRY, "position": 3}]))
+    assert rows == [ENTRY]
+
+@pytest.mark.parametrize("field", ["id", "date", "time", "name", "status", "timestamp"])
+def test_import_entry_rows_rejects_missing_fields(field):
+    entry = dict(ENTRY)
+    del entry[field]
+    with pytest.raises(ValueError, match=f"Entry 1 is missing {field}"):
+        list(import_entry_rows([ENTRY, entry]))
+
+def test_import_entry_rows_rejects_null_timestamp():
+    with pytest.raises(ValueError, match="timestamp"):
+        list(import_entry_rows([{**ENTRY, "timestamp": None}]))
+
+def test_calculate_scores_ranks_only_the_period(app, add_entries):
+    add_entries(
+        ("2024-01-07", "08:00", "Before"),   # Sunday of the previous week
+        ("2024-01-08", "08:30", "Monday"),
+        ("2024-01-14", "09:00", "Sunday"),
+        ("2024-01-15", "09:30", "After"),    # Monday of the next week
+    )
+    with app.test_request_context():
+        rankings = calculate_scores(load_data(), 'week', datetime(2024, 1, 10))
+    assert sorted(r["name"] for r in rankings) == ["Monday", "Sunday"]
@@ -0,0 +1,39 @@
+from datetime import date, datetime
+
+from app.helpers import json_dumps, minutes_to_hhmm, parse_hhmm, period_bounds
+
+def test_period_bounds_day():
+    assert period_bounds('day', date(2024, 1, 10)) == ('2024-01-10', '2024-01-10')
+
+def test_period_bounds_week_starts_on_monday():
+    # 2024-01-10 is a Wednesday
+    assert period_bounds('week', date(2024, 1, 10)) == ('2024-01-08', '2024-01-14')
+
+def test_period_bounds_month_handles_leap_february():
+    assert period_bounds('month', date(2024, 2, 15)) == ('2024-02-01', '2024-02-29')
+
+def test_period_bounds_accepts_datetime():
+    assert period_bounds('day', datetime(2024, 1, 10, 8, 30)) == ('2024-01-10', '2024-01-10')
+
+def test_period_bounds_all_time_is_unbounded():
+    assert period_bounds('all-time', date(2024, 1, 10)) is None
+
+def test_parse_hhmm():
+    assert parse_hhmm('00:00') == 0
+    assert parse_hhmm('09:05') == 545
+    assert parse_hhmm('23:59') == 1439
+
+def test_minutes_to_hhmm_round_trips():
+    for minutes in (0, 545, 1439):
+        assert parse_hhmm(minutes_to_hhmm(minutes)) == minutes
+
+def test_minutes_to_hhmm_wraps_past_midnight():
+    assert minutes_to_hhmm(1440 + 75) == '01:15'
+    assert minutes_to_hhmm(-15) == '23:45'
+
+def test_json_dumps_matches_jsonify_dates_and_key_order():
+    payload = {'streak_start': date(2024, 1, 8), 'arrival_times': [datetime(2024, 1, 8, 9, 30)]}
+    assert json_dumps(payload) == (
+        b'{"arrival_times":["Mon, 08 Jan 2024 09:30:00 GMT"],'
+        b'"streak_start":"Mon, 08 Jan 2024 00:00:00 GMT"}'
+    )
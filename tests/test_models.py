@@ -0,0 +1,22 @@
+from datetime import date
+
+from sqlalchemy import select
+
+from app.models import Entry
+
+def _derived(db, entry_id):
+    db.rollback()  # start a fresh snapshot
+    return db.execute(
+        select(Entry.date_ord, Entry.weekday, Entry.minute_of_day).where(Entry.id == entry_id)
+    ).one()
+
+def test_trigger_fills_derived_columns_on_insert(db, add_entries):
+    # 2024-01-08 is a Monday
+    [row] = add_entries(("2024-01-08", "08:30", "alice"))
+    assert tuple(_derived(db, row["id"])) == (date(2024, 1, 8).toordinal(), 0, 510)
+
+def test_trigger_recomputes_derived_columns_on_edit(auth_client, db, add_entries):
+    [row] = add_entries(("2024-01-08", "08:30", "alice"))
+    response = auth_client.patch(f"/edit/{row['id']}", json={"date": "2024-01-13", "time": "00:15"})
+    assert response.status_code == 200
+    assert tuple(_derived(db, row["id"])) == (date(2024, 1, 13).toordinal(), 5, 15)
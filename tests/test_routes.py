@@ -0,0 +1,63 @@
+from datetime import date
+
+from sqlalchemy import select
+
+from app.models import Entry
+from app.routes import _decode_history_cursor, _encode_history_cursor
+
+ENTRY = {"date": "2024-01-08", "time": "08:30", "name": "Test User", "status": "in-office"}
+
+def test_log_attendance_rejects_a_second_entry_for_the_day(auth_client, db):
+    assert auth_client.post('/log', json=ENTRY).status_code == 200
+    response = auth_client.post('/log', json={**ENTRY, "time": "09:00"})
+    assert response.status_code == 400
+    assert response.json["type"] == "error"
+
+    rows = db.execute(select(Entry.time).where(Entry.name == ENTRY["name"])).scalars().all()
+    assert rows == ["08:30"]
+
+def test_history_cursor_round_trip():
+    row = {'date': '2024-01-08', 'time': '09:30', 'id': 'abc-123'}
+    cursor = _encode_history_cursor(row)
+    assert cursor == '2024-01-08|09:30|abc-123'
+    assert _decode_history_cursor(cursor) == ('2024-01-08', '09:30', 'abc-123')
+
+def test_history_cursor_keeps_separators_in_id():
+    cursor = _encode_history_cursor({'date': '2024-01-08', 'time': '09:30', 'id': 'a|b'})
+    assert _decode_history_cursor(cursor) == ('2024-01-08', '09:30', 'a|b')
+
+def test_history_pages_cover_every_entry_once_in_order(auth_client, add_entries):
+    # Shared dates and times make the id tie-breaker decide page boundaries
+    add_entries(*[
+        (f"2024-01-0{day}", time, f"user{n}")
+        for day in (8, 9)
+        for n, time in enumerate(("08:30", "08:30", "09:00"))
+    ])
+
+    seen, cursor = [], None
+    while True:
+        query = {"per_page": 2, **({"cursor": cursor} if cursor else {})}
+        page = auth_client.get('/api/history', query_string=query).json
+        seen.extend(page["entries"])
+        cursor = page["next_cursor"]
+        assert page["has_more"] == (cursor is not None)
+        if cursor is None:
+            break
+
+    keys = [(e["date"], e["time"], e["id"]) for e in seen]
+    assert len(keys) == 6
+    assert keys == sorted(keys, reverse=True)
+
+def test_maintenance_ignores_malformed_cursors(auth_client):
+    for before in ("garbage|1", "notadate|5", "2024-01-08T09:00:00|x", "nopipe"):
+        response = auth_client.get('/maintenance', query_string={"before": before})
+        assert response.status_code == 200, before
+
+def test_today_entries_sees_new_logs_despite_cache(auth_client):
+    today = date.today().isoformat()
+    assert auth_client.get('/today-entries').json == []
+
+    # The first request cached an empty list; the bumped entries version must bypass it
+    assert auth_client.post('/log', json={**ENTRY, "date": today}).status_code == 200
+    names = [entry["name"] for entry in auth_client.get('/today-entries').json]
+    assert names == [ENTRY["name"]]
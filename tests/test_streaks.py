@@ -0,0 +1,80 @@
+from datetime import date, timedelta
+
+from app.streaks import (STREAK_MAX_GAP, _latest_run, _streak_length,
+                         calculate_current_streak, current_streak_lengths,
+                         get_current_streak_info, get_current_streak_infos,
+                         get_streak_history)
+
+TODAY = 1000
+
+def test_streak_length_empty():
+    assert _streak_length([], TODAY) == 0
+
+def test_streak_length_counts_run_ending_today():
+    assert _streak_length([1000, 999, 998], TODAY) == 3
+
+def test_streak_length_allows_gaps_up_to_max_gap():
+    assert _streak_length([1000, 1000 - STREAK_MAX_GAP], TODAY) == 2
+
+def test_streak_length_stops_at_larger_gap():
+    assert _streak_length([1000, 999, 999 - STREAK_MAX_GAP - 1], TODAY) == 2
+
+def test_streak_length_is_zero_when_latest_day_is_too_old():
+    assert _streak_length([TODAY - STREAK_MAX_GAP - 1], TODAY) == 0
+
+def test_latest_run_empty():
+    assert _latest_run([]) == (0, None)
+
+def test_latest_run_returns_length_and_first_day():
+    assert _latest_run([500, 499, 497, 400]) == (3, 497)
+
+def test_latest_run_ignores_how_old_the_run_is():
+    assert _latest_run([10]) == (1, 10)
+
+def _days_ago(*offsets):
+    return [((date.today() - timedelta(days=n)).isoformat(), "08:30", "alice") for n in offsets]
+
+def test_history_and_current_streak_split_on_the_same_gap(db, add_entries):
+    # A three-day run ending today, then a gap longer than STREAK_MAX_GAP
+    add_entries(*_days_ago(0, 1, 2, 3 + STREAK_MAX_GAP, 4 + STREAK_MAX_GAP))
+
+    history = get_streak_history("alice", db)
+    assert [streak['length'] for streak in history] == [3, 2]
+    assert history[0]['is_current'] and not history[1]['is_current']
+    assert calculate_current_streak("alice", db) == history[0]['length']
+
+def test_future_entries_do_not_count(db, add_entries):
+    add_entries(*_days_ago(0, -1))
+
+    assert get_streak_history("alice", db)[0]['length'] == 1
+    assert calculate_current_streak("alice", db) == 1
+
+def test_current_streak_info_matches_history(db, add_entries):
+    add_entries(*_days_ago(4, 5, 6, 20))
+
+    info = get_current_streak_info("alice", db)
+    newest = get_streak_history("alice", db)[0]
+    assert info == {
+        'length': newest['length'],
+        'start': newest['start'],
+        'is_current': newest['is_current']
+    }
+    assert info['length'] == 3 and not info['is_current']
+
+def test_current_streak_lengths_zeroes_broken_streaks():
+    infos = {
+        'alice': {'length': 3, 'start': '2024-01-01', 'is_current': True},
+        'bob': {'length': 5, 'start': '2023-12-01', 'is_current': False},
+    }
+    assert current_streak_lengths(infos) == {'alice': 3, 'bob': 0}
+
+def test_batched_streak_infos_match_single_user_lookups(db, add_entries):
+    add_entries(*_days_ago(0, 1, 2))
+    add_entries(*[(day, time, "bob") for day, time, _ in _days_ago(1, 3, 30)])
+    add_entries(*[(day, time, "carol") for day, time, _ in _days_ago(40)])
+
+    names = ["alice", "bob", "carol", "nobody"]
+    infos = get_current_streak_infos(names, db)
+    assert infos == {name: get_current_streak_info(name, db) for name in names}
+    assert current_streak_lengths(infos)["alice"] == calculate_current_streak("alice", db)
+    assert current_streak_lengths(infos)["carol"] == 0
@@ -0,0 +1,40 @@
+from app.visualisation import summarize_attendance
+
+def _entry(name, status, weekday, minute):
+    return {'name': name, 'status': status, 'weekday': weekday, 'minute_of_day': minute}
+
+def test_summarize_attendance():
+    summary = summarize_attendance([
+        _entry('alice', 'in-office', 0, 8 * 60 + 30),
+        _entry('alice', 'remote', 1, 9 * 60 + 15),
+        _entry('alice', 'sick', 2, 10 * 60),
+        _entry('bob', 'in_office', 5, 9 * 60),
+    ])
+
+    patterns = summary['weeklyPatterns']
+    assert patterns['Monday-08:30'] == 1
+    assert patterns['Tuesday-09:15'] == 1
+    # Weekends and non-attendance statuses never reach the heatmap
+    assert sum(patterns.values()) == 2
+
+    assert summary['lateArrivalAnalysis']['alice'] == {
+        'late_percentage': 50.0, 'total_days': 2, 'late_count': 1
+    }
+    assert summary['lateArrivalAnalysis']['bob']['late_count'] == 1
+
+    alice = summary['userComparison']['alice']
+    assert alice['total_days'] == 3
+    assert alice['in_office_days'] == 1
+    assert alice['remote_days'] == 1
+    assert alice['early_arrivals'] == 1
+
+def test_summarize_attendance_skips_malformed_entries():
+    summary = summarize_attendance([{'name': 'alice', 'status': 'remote'}])
+    assert summary['lateArrivalAnalysis'] == {}
+    assert summary['userComparison']['alice']['total_days'] == 1
+
+def test_summarize_attendance_empty():
+    summary = summarize_attendance([])
+    assert summary['lateArrivalAnalysis'] == {}
+    assert summary['userComparison'] == {}
+    assert set(summary['weeklyPatterns'].values()) == {0}